@@ -0,0 +1,314 @@
+"""
+API JSON en lecture seule sur le snapshot des axes (bibliothèque standard uniquement) :
+
+    python api.py --runs BDD_axes.xlsx --port 8502
+
+    GET /version                          version du snapshot, date d'import, volumes
+    GET /best?Currency=EUR,USD&AXE_Offer_YLD=4:6&tri=AXE_Offer_YLD&ordre=desc&offset=0&limit=100
+    GET /axes?ISIN=XS...                  mêmes filtres sur tous les axes (un par dealer)
+    GET /best?ecran=EUR IG FIN 3-7Y       écran enregistré (ecrans_axes.json)
+    GET /isin/<ISIN>                      fiche du titre et profondeur par dealer
+    GET /courbe/<Ticker>?y=AXE_Offer_YLD&Currency=EUR
+
+Filtres : `col=min:max` pour les colonnes numériques et Maturity (borne vide = ouverte),
+`col=v1,v2` pour les autres, `exclure_144a=1`, `tolerance=<points>`.
+Les réponses portent un ETag dérivé de la version du snapshot et, pour `ecran=`, de la
+définition de l'écran (If-None-Match -> 304). Erreurs : corps JSON {"erreur": ...}.
+Le snapshot est partagé par toutes les requêtes et rafraîchi en arrière-plan.
+"""
+import argparse
+import hashlib
+import json
+import sys
+import threading
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+
+import pandas as pd
+
+from utils.best_axe import axes_par_dealer
+from utils.cache_filtres import CacheLRU
+from utils.courbes import courbe_emetteur
+from utils.data_cleaning import empreinte_donnees
+from utils.ecrans import FICHIER_ECRANS, charger_ecrans
+from utils.filters import normaliser_etat, positions_filtrees
+from utils.index_axes import trier_positions
+from utils.snapshot import construire_snapshot, date_du_jour, version_snapshot
+from utils.sources import ExcelSource, source_depuis_env
+
+LIMITE_DEFAUT = 100
+LIMITE_MAX = 5000
+PARAMETRES_RESERVES = {"offset", "limit", "tri", "ordre", "ecran", "exclure_144a", "tolerance", "y"}
+
+
+class RequeteInvalide(ValueError):
+    pass
+
+
+class ServeurAxes:
+    """
+    Détient le snapshot courant et le remplace quand la source change.
+    Les requêtes lisent la référence une fois : un rafraîchissement ne les perturbe pas.
+    """
+
+    def __init__(self, source, fichier_ecrans=FICHIER_ECRANS):
+        self.source = source
+        self.fichier_ecrans = fichier_ecrans
+        self.snapshot = None
+        self.cache = CacheLRU()
+        self._lock = threading.Lock()
+        self.rafraichir()
+
+    def rafraichir(self):
+        """
+        Relit la source ; reconstruit le snapshot seulement si les données ont changé, ou
+        au changement de jour (durées résiduelles et buckets de maturité).
+        """
+        df_raw = self.source.fetch()
+        empreinte = empreinte_donnees(df_raw)
+        date_reference = date_du_jour()
+        with self._lock:
+            if self.snapshot is not None and self.snapshot.version == version_snapshot(empreinte, date_reference):
+                return False
+        snapshot = construire_snapshot(df_raw, empreinte=empreinte, date_reference=date_reference)
+        with self._lock:
+            self.snapshot = snapshot
+        return True
+
+    def rafraichir_en_boucle(self, intervalle, arret):
+        while not arret.wait(intervalle):
+            try:
+                self.rafraichir()
+            except Exception as e:
+                print(f"Rafraîchissement du snapshot impossible : {e}", file=sys.stderr)
+
+
+# === Construction des réponses ===
+
+def _borne(valeur, datetime):
+    if valeur == "":
+        return None
+    return pd.Timestamp(valeur) if datetime else float(valeur)
+
+
+def etat_depuis_requete(df, params, ecrans=None):
+    """État de filtres (format de utils/filters.py) à partir des paramètres d'URL."""
+    etat = {"plages": {}, "categories": {}}
+    if "ecran" in params:
+        nom = params["ecran"][-1]
+        if not ecrans or nom not in ecrans:
+            raise RequeteInvalide(f"écran inconnu : {nom}")
+        etat = {**ecrans[nom], "plages": dict(ecrans[nom].get("plages") or {}),
+                "categories": dict(ecrans[nom].get("categories") or {})}
+    for col, valeurs in params.items():
+        if col in PARAMETRES_RESERVES:
+            continue
+        if col not in df.columns:
+            raise RequeteInvalide(f"colonne inconnue : {col}")
+        valeur = valeurs[-1]
+        serie = df[col]
+        est_date = pd.api.types.is_datetime64_any_dtype(serie)
+        if est_date or pd.api.types.is_numeric_dtype(serie):
+            if ":" not in valeur:
+                raise RequeteInvalide(f"{col} : plage attendue sous la forme min:max")
+            vmin, vmax = valeur.split(":", 1)
+            try:
+                etat["plages"][col] = (_borne(vmin, est_date), _borne(vmax, est_date))
+            except ValueError:
+                raise RequeteInvalide(f"{col} : borne invalide dans {valeur!r}")
+        else:
+            etat["categories"][col] = [v for v in valeur.split(",") if v]
+    if params.get("exclure_144a", ["0"])[-1] in ("1", "true", "oui"):
+        etat["exclure_144a"] = True
+    if "tolerance" in params:
+        try:
+            etat["tolerance_composite"] = float(params["tolerance"][-1])
+        except ValueError:
+            raise RequeteInvalide("tolerance doit être un nombre")
+    return etat
+
+
+def _entier(params, nom, defaut, maximum=None):
+    try:
+        valeur = int(params.get(nom, [defaut])[-1])
+    except ValueError:
+        raise RequeteInvalide(f"{nom} doit être un entier")
+    if valeur < 0:
+        raise RequeteInvalide(f"{nom} doit être positif")
+    return min(valeur, maximum) if maximum else valeur
+
+
+def _json_lignes(df):
+    return df.to_json(orient="records", date_format="iso", date_unit="s", force_ascii=False)
+
+
+def reponse_table(snapshot, nom_table, params, ecrans, cache):
+    df = getattr(snapshot, nom_table)
+    index = snapshot.index_pour(df)
+    etat = etat_depuis_requete(df, params, ecrans)
+    positions = positions_filtrees(df, etat, index=index, cache=cache, version=(snapshot.version, nom_table))
+
+    tri = params.get("tri", [""])[-1]
+    if tri:
+        if tri not in df.columns:
+            raise RequeteInvalide(f"colonne de tri inconnue : {tri}")
+        positions = trier_positions(df, positions, tri, params.get("ordre", ["asc"])[-1] != "desc", index)
+
+    offset = _entier(params, "offset", 0)
+    limit = _entier(params, "limit", LIMITE_DEFAUT, LIMITE_MAX)
+    page = df.take(positions[offset:offset + limit])
+    return (f'{{"version":{json.dumps(snapshot.version)},"total":{len(positions)},'
+            f'"offset":{offset},"limit":{limit},"lignes":{_json_lignes(page)}}}')
+
+
+def reponse_isin(snapshot, isin):
+    axes = snapshot.best_engine.axes_isin(isin)
+    if axes.empty:
+        return None
+    dealers = axes_par_dealer(axes)
+    colonnes_titre = [col for col in ["Bond ID", "IssuerName", "ISIN", "Ticker", "Maturity", "Currency", "Coupon",
+                                      "CouponType", "Sector", "Sub_Sector", "FitchRating", "Moody's_rating",
+                                      "Rating_Category", "Composite_Bid_Price", "Composite_Offer_Price", "Mid_Price"]
+                      if col in axes.columns]
+    colonnes_dealers = [col for col in ["Dealer", "AXE_Offer_Price", "AXE_Offer_YLD", "AXE_Offer_BMK_SPD",
+                                        "AXE_Offer_QTY", "Axe_Mid_Spread", "AXE_Offer_Z-SPD", "AXE_Offer_I-SPD",
+                                        "AXE_Offer_ASW"] if col in dealers.columns]
+    titre = _json_lignes(axes[colonnes_titre].iloc[:1])[1:-1]
+    return (f'{{"version":{json.dumps(snapshot.version)},"titre":{titre},'
+            f'"nb_dealers":{len(dealers)},"dealers":{_json_lignes(dealers[colonnes_dealers])}}}')
+
+
+def reponse_courbe(snapshot, ticker, params):
+    y_axis = params.get("y", ["AXE_Offer_YLD"])[-1]
+    if y_axis not in snapshot.df_best.columns:
+        raise RequeteInvalide(f"mesure inconnue : {y_axis}")
+    serie = snapshot.df_best[y_axis]
+    if not pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_bool_dtype(serie):
+        raise RequeteInvalide(f"mesure non numérique : {y_axis}")
+    points, courbe = courbe_emetteur(
+        snapshot.df_best, ticker, y_axis=y_axis,
+        emetteurs=params["IssuerName"][-1].split(",") if "IssuerName" in params else None,
+        devises=params["Currency"][-1].split(",") if "Currency" in params else None,
+        sous_secteurs=params["Sub_Sector"][-1].split(",") if "Sub_Sector" in params else None,
+        date_ref=snapshot.date_reference,
+    )
+    if points.empty:
+        return None
+    resultat = {"version": snapshot.version, "ticker": ticker, "y": y_axis, "courbe": None}
+    if courbe is not None:
+        x_lisse, y_lisse, libelle = courbe
+        resultat["courbe"] = {"methode": libelle, "x": x_lisse.round(4).tolist(), "y": y_lisse.round(4).tolist()}
+    return json.dumps(resultat)[:-1] + f',"points":{_json_lignes(points)}}}'
+
+
+class GestionnaireAxes(BaseHTTPRequestHandler):
+    serveur_axes = None
+    server_version = "AxesAPI/1.0"
+
+    def _envoyer(self, statut, corps=None, etag=None):
+        donnees = corps.encode("utf-8") if corps is not None else b""
+        self.send_response(statut)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if corps is not None:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(donnees)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(donnees)
+
+    def _erreur(self, statut, message):
+        self._envoyer(statut, json.dumps({"erreur": message}, ensure_ascii=False))
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def _etag(self, snapshot, params, ecrans):
+        # Un écran redéfini sous le même nom change la réponse sans changer l'URL
+        definition = ""
+        if ecrans is not None and params["ecran"][-1] in ecrans:
+            definition = repr(normaliser_etat(ecrans[params["ecran"][-1]]))
+        return '"' + hashlib.sha1(f"{snapshot.version}|{self.path}|{definition}".encode()).hexdigest() + '"'
+
+    def do_GET(self):
+        snapshot = self.serveur_axes.snapshot
+        url = urlsplit(self.path)
+        params = parse_qs(url.query, keep_blank_values=True)
+        morceaux = [unquote(m) for m in url.path.strip("/").split("/") if m]
+        try:
+            ecrans = charger_ecrans(self.serveur_axes.fichier_ecrans) if "ecran" in params else None
+            etag = self._etag(snapshot, params, ecrans)
+            if etag in [e.strip() for e in self.headers.get("If-None-Match", "").split(",")]:
+                self._envoyer(304, etag=etag)
+                return
+
+            if morceaux == ["version"]:
+                corps = json.dumps({
+                    "version": snapshot.version,
+                    "dernier_import": snapshot.last_import.isoformat(),
+                    "axes": len(snapshot.df_full_axes),
+                    "best": len(snapshot.df_best),
+                    "cache_filtres": self.serveur_axes.cache.stats(),
+                })
+            elif morceaux in (["best"], ["axes"]):
+                table = "df_best" if morceaux == ["best"] else "df_full_axes"
+                corps = reponse_table(snapshot, table, params, ecrans, self.serveur_axes.cache)
+            elif len(morceaux) == 2 and morceaux[0] == "isin":
+                corps = reponse_isin(snapshot, morceaux[1])
+            elif len(morceaux) == 2 and morceaux[0] == "courbe":
+                corps = reponse_courbe(snapshot, morceaux[1], params)
+            else:
+                self._erreur(404, f"ressource inconnue : {url.path}")
+                return
+        except RequeteInvalide as e:
+            self._erreur(400, str(e))
+            return
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+            self._erreur(500, "erreur interne du serveur")
+            return
+        if corps is None:
+            self._erreur(404, f"aucun axe pour {morceaux[1]}")
+            return
+        self._envoyer(200, corps, etag)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def creer_serveur(serveur_axes, hote="127.0.0.1", port=8502):
+    gestionnaire = type("Gestionnaire", (GestionnaireAxes,), {"serveur_axes": serveur_axes})
+    return ThreadingHTTPServer((hote, port), gestionnaire)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API JSON en lecture seule sur les axes crédit.")
+    parser.add_argument("--runs", help="classeur Runs (défaut : source configurée, voir utils/sources.py)")
+    parser.add_argument("--hote", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--rafraichissement", type=float, default=60, help="secondes entre deux relectures de la source")
+    parser.add_argument("--ecrans", default=FICHIER_ECRANS, help="fichier des écrans enregistrés")
+    args = parser.parse_args(argv)
+    pd.set_option("mode.copy_on_write", True)
+
+    source = ExcelSource(args.runs) if args.runs else source_depuis_env()
+    serveur_axes = ServeurAxes(source, fichier_ecrans=args.ecrans)
+    arret = threading.Event()
+    threading.Thread(target=serveur_axes.rafraichir_en_boucle, args=(args.rafraichissement, arret), daemon=True).start()
+
+    serveur = creer_serveur(serveur_axes, args.hote, args.port)
+    print(f"API axes sur http://{args.hote}:{args.port} ({serveur_axes.snapshot!r})")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        arret.set()
+        serveur.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
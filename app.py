@@ -1,20 +1,26 @@
+import pandas as pd
 import streamlit as st
-from modules import accueil, portfolio, filtrer_les_axes, chercher_emetteur, flux, Whichlist
+from utils.demarrage import PAGES, importer_page
 
 st.set_page_config(layout="wide", page_title="AXES Crédit")
 
+# Les DataFrames du snapshot sont partagés entre sessions : les sous-ensembles et colonnes
+# dérivées des pages deviennent des vues paresseuses au lieu de copies complètes
+pd.set_option("mode.copy_on_write", True)
+
 if "page" not in st.session_state:
     st.session_state.page = "accueil"
 
-if st.session_state.page == "accueil":
-    accueil.show()
-elif st.session_state.page == "portfolio":
-    portfolio.show(st.session_state.df) 
-elif st.session_state.page == "filtrer_les_axes":
-    filtrer_les_axes.show(st.session_state.df)  
-elif st.session_state.page == "chercher_emetteur":
-    chercher_emetteur.show(st.session_state.df) 
-elif st.session_state.page == "Whichlist":
-    Whichlist.show(st.session_state.df) 
-elif st.session_state.page == "flux":
-    flux.show(st.session_state.df_full_axes)  
+# Les modules de page (et scipy, plotly.express...) ne sont importés qu'à la première
+# navigation vers la page : le démarrage ne paie que l'accueil
+module_page = importer_page(st.session_state.page)
+cle_donnees = PAGES[st.session_state.page][1]
+if cle_donnees is None:
+    module_page.show()
+else:
+    module_page.show(st.session_state[cle_donnees])
+
+# Panneau d'instrumentation caché : ajouter ?debug=1 à l'URL
+if st.query_params.get("debug") == "1":
+    from modules import debug
+    debug.show()
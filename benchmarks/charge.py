@@ -0,0 +1,252 @@
+"""
+Test de charge de l'application : N sessions simultanées pilotées par AppTest (sans navigateur),
+qui naviguent dans les vraies pages et manipulent leurs widgets.
+
+    python -m benchmarks.charge --sessions 1,10,30
+    python -m benchmarks.charge --sessions 30 --froid --lignes 100000
+
+Toutes les sessions tournent dans ce process, comme sur un serveur Streamlit : elles partagent
+les caches (snapshot, index, filtres) et le GIL. Pour chaque niveau de concurrence :
+latence des reruns (p50 / p95 / p99, globale et par étape du parcours), RSS du process
+(fin de niveau et pic). Résultats JSON dans benchmarks/resultats/.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FICHIER_APP = os.path.join(RACINE, "app.py")
+DOSSIER_RESULTATS = os.path.join(RACINE, "benchmarks", "resultats")
+
+
+def rss_octets():
+    """RSS courant du process (Linux : /proc, sinon pic getrusage)."""
+    try:
+        with open("/proc/self/status") as f:
+            for ligne in f:
+                if ligne.startswith("VmRSS:"):
+                    return int(ligne.split()[1]) * 1024
+    except OSError:
+        pass
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pic if sys.platform == "darwin" else pic * 1024
+
+
+class SuiviRSS:
+    """Relève le RSS toutes les `intervalle` secondes dans un thread, pour en garder le pic."""
+
+    def __init__(self, intervalle=0.1):
+        self.intervalle = intervalle
+        self.pic = rss_octets()
+        self._arret = threading.Event()
+        self._thread = threading.Thread(target=self._boucle, daemon=True)
+
+    def _boucle(self):
+        while not self._arret.wait(self.intervalle):
+            self.pic = max(self.pic, rss_octets())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._arret.set()
+        self._thread.join()
+        self.pic = max(self.pic, rss_octets())
+
+
+def _widget(elements, label):
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"widget introuvable : {label}")
+
+
+def _premiere_option(selectbox):
+    return next(option for option in selectbox.options if option)
+
+
+def _resserrer(slider):
+    """Plage du slider réduite de moitié autour de son centre."""
+    vmin, vmax = slider.value
+    marge = (vmax - vmin) / 4
+    return slider.set_range(vmin + marge, vmax - marge)
+
+
+def _aller(page):
+    """Navigation comme les boutons de l'accueil (st.session_state.page), sans le st.rerun du clic."""
+    def action(at):
+        at.session_state["page"] = page
+        return at
+    return action
+
+
+# Parcours d'un trader : (étape, action sur l'AppTest avant le rerun)
+PARCOURS = [
+    ("accueil", lambda at: at),
+    ("accueil.tri", lambda at: at.selectbox(key="accueil_tri").select("AXE_Offer_YLD")),
+    ("filtrer_les_axes", _aller("filtrer_les_axes")),
+    ("filtrer.devises", lambda at: _widget(at.multiselect, "Devises").select(_widget(at.multiselect, "Devises").options[0])),
+    ("filtrer.notation", lambda at: _widget(at.multiselect, "Notation crédit").select(_widget(at.multiselect, "Notation crédit").options[0])),
+    ("filtrer.yield", lambda at: _resserrer(_widget(at.slider, "Yield (%)"))),
+    ("filtrer.144a", lambda at: _widget(at.checkbox, "Exclure les titres 144A").check()),
+    ("portfolio", _aller("portfolio")),
+    ("portfolio.asset_manager", lambda at: _widget(at.selectbox, "Asset Manager").select(
+        _premiere_option(_widget(at.selectbox, "Asset Manager")))),
+    ("chercher_emetteur", _aller("chercher_emetteur")),
+    ("chercher_emetteur.selection", lambda at: at.selectbox[0].select_index(1)),
+    ("chercher_emetteur.axe_y", lambda at: _widget(at.selectbox, "Axe Y").select("AXE_Offer_BMK_SPD")),
+]
+
+
+def _arbre_vide(at):
+    return all(type(element).__name__ == "SpecialBlock" for element in at.main)
+
+
+def session(iterations, timeout, essais=3):
+    """
+    Une session simulée : `iterations` parcours complets. Renvoie [(étape, latence s, erreur, reprises)].
+    AppTest renvoie parfois un arbre vide quand beaucoup de tests tournent en parallèle dans le même
+    process (limite de l'outil, reproduite sur une app triviale) : le rerun est alors rejoué, jusqu'à
+    `essais` fois, et seule la latence du rerun abouti est gardée.
+    """
+    from streamlit.testing.v1 import AppTest
+    mesures = []
+    for _ in range(iterations):
+        at = AppTest.from_file(FICHIER_APP, default_timeout=timeout)
+        for etape, action in PARCOURS:
+            erreur, reprises, debut = None, 0, time.perf_counter()
+            try:
+                action(at)
+                for reprises in range(essais):
+                    debut = time.perf_counter()
+                    at.run()
+                    latence = time.perf_counter() - debut
+                    if not _arbre_vide(at):
+                        break
+                if at.exception:
+                    erreur = at.exception[0].value
+            except Exception as e:
+                latence = time.perf_counter() - debut
+                erreur = f"{type(e).__name__}: {e}"
+            mesures.append((etape, latence, erreur, reprises))
+            if erreur:
+                break
+    return mesures
+
+
+def _percentiles(latences):
+    p50, p95, p99 = np.percentile(latences, [50, 95, 99]) if latences else (np.nan,) * 3
+    return {"n": len(latences), "p50_s": round(float(p50), 4), "p95_s": round(float(p95), 4),
+            "p99_s": round(float(p99), 4), "max_s": round(float(max(latences, default=np.nan)), 4)}
+
+
+def niveau(nb_sessions, iterations, timeout, froid):
+    """Lance `nb_sessions` sessions simultanées et agrège leurs latences."""
+    import streamlit as st
+    if froid:
+        # Arrivée du run du matin : snapshot, index et caches à reconstruire
+        st.cache_resource.clear()
+        st.cache_data.clear()
+    debut = time.perf_counter()
+    with SuiviRSS() as suivi, ThreadPoolExecutor(max_workers=nb_sessions) as pool:
+        resultats = list(pool.map(lambda _: session(iterations, timeout), range(nb_sessions)))
+    duree = time.perf_counter() - debut
+
+    mesures = [m for r in resultats for m in r]
+    erreurs = [f"{etape}: {erreur}" for etape, _, erreur, _ in mesures if erreur]
+    par_etape = {}
+    for etape, latence, erreur, _ in mesures:
+        if not erreur:
+            par_etape.setdefault(etape, []).append(latence)
+    return {
+        "sessions": nb_sessions,
+        "iterations": iterations,
+        "froid": froid,
+        "duree_s": round(duree, 3),
+        "reruns_par_s": round(len(mesures) / duree, 2),
+        **_percentiles([latence for _, latence, erreur, _ in mesures if not erreur]),
+        "rss_fin_octets": rss_octets(),
+        "rss_pic_octets": suivi.pic,
+        "reruns_rejoues": sum(reprises for *_, reprises in mesures),
+        "erreurs": len(erreurs),
+        "exemples_erreurs": sorted(set(erreurs))[:5],
+        "par_etape": {etape: _percentiles(latences) for etape, latences in par_etape.items()},
+    }
+
+
+def _preparer_donnees(dossier, lignes, seed):
+    """Dossier de travail de l'application : BDD_axes.xlsx synthétique si `lignes`, sinon celui du dossier."""
+    from benchmarks.generateur import generer_runs, generer_portefeuille
+    runs = generer_runs(lignes, seed=seed)
+    with pd.ExcelWriter(os.path.join(dossier, "BDD_axes.xlsx")) as writer:
+        runs.to_excel(writer, sheet_name="Runs", index=False)
+        generer_portefeuille(runs["Isin"], max(100, lignes // 10), seed=seed + 1).to_excel(
+            writer, sheet_name="Portfolio", index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test de charge multi-sessions de l'application (AppTest).")
+    parser.add_argument("--sessions", default="1,5,10,30", help="niveaux de concurrence testés")
+    parser.add_argument("--iterations", type=int, default=1, help="parcours complets par session")
+    parser.add_argument("--froid", action="store_true", help="vider les caches Streamlit avant chaque niveau")
+    parser.add_argument("--lignes", type=int, help="générer un classeur synthétique de cette taille (sinon BDD_axes.xlsx du dossier courant)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=300, help="délai maximal d'un rerun (s)")
+    parser.add_argument("--sortie", default=DOSSIER_RESULTATS, help="dossier des résultats JSON")
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore")
+    sortie = os.path.abspath(args.sortie)
+    dossier_temporaire = None
+    if args.lignes:
+        dossier_temporaire = tempfile.mkdtemp(prefix="charge_axes_")
+        _preparer_donnees(dossier_temporaire, args.lignes, args.seed)
+        os.chdir(dossier_temporaire)
+    elif not os.path.exists("BDD_axes.xlsx"):
+        parser.error("BDD_axes.xlsx absent du dossier courant (ou utiliser --lignes)")
+    if RACINE not in sys.path:
+        sys.path.insert(0, RACINE)
+
+    niveaux = []
+    try:
+        for nb_sessions in [int(n) for n in args.sessions.split(",") if n.strip()]:
+            resultat = niveau(nb_sessions, args.iterations, args.timeout, args.froid)
+            niveaux.append(resultat)
+            print(f"{nb_sessions:>4} session(s) : p50 {resultat['p50_s']:.3f} s, p95 {resultat['p95_s']:.3f} s, "
+                  f"p99 {resultat['p99_s']:.3f} s, {resultat['reruns_par_s']:.1f} reruns/s, "
+                  f"RSS {resultat['rss_fin_octets'] / 1e6:,.0f} Mo (pic {resultat['rss_pic_octets'] / 1e6:,.0f} Mo), "
+                  f"{resultat['erreurs']} erreur(s)", flush=True)
+            for erreur in resultat["exemples_erreurs"]:
+                print(f"       {erreur}")
+    finally:
+        if dossier_temporaire:
+            os.chdir(RACINE)
+            shutil.rmtree(dossier_temporaire, ignore_errors=True)
+
+    horodatage = datetime.now()
+    os.makedirs(sortie, exist_ok=True)
+    chemin = os.path.join(sortie, f"charge_{horodatage:%Y%m%d_%H%M%S}.json")
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump({"date": horodatage.isoformat(timespec="seconds"), "python": platform.python_version(),
+                   "machine": platform.platform(), "lignes": args.lignes, "niveaux": niveaux},
+                  f, ensure_ascii=False, indent=2)
+    print(f"Résultats : {chemin}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Données synthétiques au format des feuilles "Runs" et "Portfolio" de BDD_axes.xlsx,
+à n'importe quelle échelle (benchmarks, tests de charge) :
+
+    python -m benchmarks.generateur --lignes 100000 --sortie BDD_axes_100k.xlsx
+
+Les valeurs reprennent les formats hétérogènes des runs réels : quantités "1 000" / "2,000",
+rendements "4,5%", prix à virgule, notations vides ou "WD", secteurs absents...
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+TICKERS = ["BNP", "SOCGEN", "ACAFP", "TTEFP", "ORAFP", "VW", "RENAUL", "EDF", "ENGIFP", "SANFP",
+           "AIRFP", "STLA", "BPCE", "DBR", "UCGIM", "ISPIM", "HSBC", "BACR", "TELEFO", "IBESM"]
+DEVISES = {"EUR": 0.7, "USD": 0.2, "GBP": 0.1}
+SECTEURS = {
+    "IG - SnBnk/Fin": 0.18, "IG - Lower Tier 2": 0.08, "IG CoCo": 0.04, "IG - Upper T2": 0.02,
+    "IG - Industrial": 0.18, "IG - Utilities": 0.08, "IG - Telecom": 0.06,
+    "HY - Energy": 0.08, "HY-Telecom": 0.06, "HY - Autos": 0.08, "EM - Sovereign": 0.06, None: 0.08,
+}
+# Notations Fitch / Moody's tirées ensemble (même qualité de crédit), avec des valeurs invalides
+NOTATIONS = {
+    ("AA-", "Aa3"): 0.06, ("A+", "A1"): 0.12, ("A-", "A3"): 0.14, ("BBB+", "Baa1"): 0.14,
+    ("BBB-", "Baa3"): 0.14, ("BB+", "Ba1"): 0.10, ("BB-", "Ba3"): 0.08, ("B", "B2"): 0.07,
+    ("CCC", "Caa2"): 0.03, ("NR", "Baa2"): 0.04, ("", "NR"): 0.03, (None, None): 0.03, ("WD", "WR"): 0.02,
+}
+
+
+def _tirage(rng, distribution, n):
+    valeurs = list(distribution)
+    poids = np.array(list(distribution.values()), dtype=float)
+    indices = rng.choice(len(valeurs), size=n, p=poids / poids.sum())
+    return indices, valeurs
+
+
+def _texte_virgule(valeurs, decimales, suffixe=""):
+    """Nombres au format texte français : "4,50%"."""
+    return pd.Series(np.round(valeurs, decimales)).map(lambda v: f"{v:.{decimales}f}".replace(".", ",") + suffixe).to_numpy()
+
+
+def generer_runs(nb_lignes, nb_isins=None, nb_dealers=12, imports_par_jour=1, jours=1,
+                 mix_notations=None, mix_secteurs=None, part_texte=0.3, date_debut="2025-06-02", seed=0):
+    """
+    Feuille "Runs" synthétique : `nb_lignes` axes (ISIN x dealer) par import,
+    `imports_par_jour` x `jours` imports (clean_full_dataframe ne garde que le dernier).
+    `part_texte` : proportion des valeurs numériques écrites en texte ("4,5%", "1 000").
+    """
+    rng = np.random.default_rng(seed)
+    nb_isins = nb_isins or max(1, nb_lignes * 2 // nb_dealers)
+    mix_notations = mix_notations or NOTATIONS
+    mix_secteurs = mix_secteurs or SECTEURS
+
+    # Caractéristiques fixes de chaque titre
+    ticker = rng.choice(TICKERS, nb_isins)
+    i_secteur, secteurs = _tirage(rng, mix_secteurs, nb_isins)
+    i_notation, notations = _tirage(rng, mix_notations, nb_isins)
+    i_devise, devises = _tirage(rng, DEVISES, nb_isins)
+    maturite = pd.Timestamp(date_debut) + pd.to_timedelta(rng.integers(30, 30 * 365, nb_isins), unit="D")
+    maturite = pd.Series(maturite).astype(object)
+    maturite[rng.random(nb_isins) < 0.03] = None  # perpétuelles
+    coupon = np.round(rng.uniform(0, 7, nb_isins), 3)
+    prix_mid = rng.uniform(80, 110, nb_isins)
+    rendement = np.clip(rng.normal(4, 1.8, nb_isins), 0.1, 15)
+    spread = rng.uniform(20, 600, nb_isins)
+    suffixe = np.select([np.arange(nb_isins) % 17 == 0, np.arange(nb_isins) % 5 == 0], [" 144A", " SUB"], "")
+    isin = np.char.add("XS", np.char.zfill(np.arange(nb_isins).astype(str), 10))
+    bond_id = np.char.add(np.char.add(ticker, " "), np.char.add(np.arange(nb_isins).astype(str), suffixe))
+
+    imports = []
+    for k in range(jours * imports_par_jour):
+        date_import = pd.Timestamp(date_debut) + pd.Timedelta(days=k // imports_par_jour, hours=8 + 9 * (k % imports_par_jour) // imports_par_jour)
+        i = rng.integers(0, nb_isins, nb_lignes)
+        n = nb_lignes
+        prix = prix_mid[i] + rng.normal(0, 0.6, n)
+        yld = rendement[i] + rng.normal(0, 0.1, n)
+        texte = rng.random(n) < part_texte
+
+        qty = rng.choice([250, 500, 1000, 2000, 5000], n).astype(object)
+        espace = rng.random(n) < 0.5
+        for separateur, masque in ((" ", texte & espace), (",", texte & ~espace)):
+            qty[masque] = np.char.replace(np.char.mod("%d", qty[masque].astype(int)), "000", separateur + "000")
+        qty[rng.random(n) < 0.02] = None
+        qty[rng.random(n) < 0.01] = 0
+
+        yld_brut = yld.round(3).astype(object)
+        yld_brut[texte] = _texte_virgule(yld[texte], 2, "%")
+        prix_brut = prix.round(3).astype(object)
+        virgule = rng.random(n) < part_texte / 3
+        prix_brut[virgule] = _texte_virgule(prix[virgule], 3)
+        # Prix et rendement inversés dans quelques runs
+        inverse = rng.random(n) < 0.01
+        prix_brut[inverse], yld_brut[inverse] = yld_brut[inverse], prix_brut[inverse]
+
+        stream = rng.random(n) < 0.5
+        stream_prix = np.full(n, None, dtype=object)
+        stream_prix[stream] = _texte_virgule(prix[stream] + rng.choice([0, 0, 0, 15], stream.sum()), 2)
+        stream_yld = np.full(n, None, dtype=object)
+        stream_yld[stream] = _texte_virgule(yld[stream], 2, "%")
+
+        fitch = np.array([notations[j][0] for j in range(len(notations))], dtype=object)[i_notation[i]]
+        moodys = np.array([notations[j][1] for j in range(len(notations))], dtype=object)[i_notation[i]]
+        imports.append(pd.DataFrame({
+            "ImportDateTime": date_import,
+            "Dealer": np.char.add("Dealer ", rng.integers(1, nb_dealers + 1, n).astype(str)),
+            "Isin": isin[i],
+            "Issuer name": np.char.add(ticker[i], " SA"),
+            "Ticker": ticker[i],
+            "Bond ID": bond_id[i],
+            "Sector": np.array(secteurs, dtype=object)[i_secteur[i]],
+            "Currency": np.array(devises, dtype=object)[i_devise[i]],
+            "Coupon": coupon[i],
+            "Coupon type": np.where(rng.random(n) < 0.9, "FIXED", "FLOATING"),
+            "Maturity": maturite.to_numpy()[i],
+            "Fitch rating": fitch,
+            "Moody's rating": moodys,
+            "IA_Offer_Price": prix_brut,
+            "IA_Offer_YLD": yld_brut,
+            "IA_Offer_QTY": qty,
+            "IA_Offer_BMK_SPD": np.round(spread[i] + rng.normal(0, 5, n), 1),
+            "IA_Offer_I-SPD": np.round(spread[i] + rng.normal(0, 8, n), 1),
+            "IA_Offer_Z-SPD": np.round(spread[i] + rng.normal(0, 8, n), 1),
+            "IA_Offer_ASW": np.round(spread[i] + rng.normal(0, 10, n), 1),
+            "Stream_Offer_Price": stream_prix,
+            "Stream_Offer_YLD": stream_yld,
+            "TW_Offer_Price": np.round(prix_mid[i] + rng.uniform(0, 1, n), 3),
+            "TW_Bid_Price": np.round(prix_mid[i] - rng.uniform(0, 1, n), 3),
+        }))
+    return pd.concat(imports, ignore_index=True)
+
+
+def generer_portefeuille(isins, nb_operations, asset_managers=("AM1", "AM2", "AM3"), nb_fonds=8,
+                         nb_gerants=5, date_fin="2025-06-01", seed=1):
+    """Feuille "Portfolio" synthétique : opérations buy / sell sur une partie des ISIN (sens en casse libre)."""
+    rng = np.random.default_rng(seed)
+    isins = np.asarray(pd.unique(np.asarray(isins)))
+    detenus = rng.choice(isins, size=max(1, min(len(isins), nb_operations // 4)), replace=False)
+    return pd.DataFrame({
+        "Asset Manager": rng.choice(list(asset_managers), nb_operations),
+        "Date": pd.Timestamp(date_fin) - pd.to_timedelta(rng.integers(0, 720, nb_operations), unit="D"),
+        "Qty": rng.integers(1, 100, nb_operations) * 1000,
+        "Sens": rng.choice(["Buy", "buy", "Sell", "sell "], nb_operations, p=[0.35, 0.3, 0.2, 0.15]),
+        "Fonds": np.char.add("Fonds ", rng.integers(1, nb_fonds + 1, nb_operations).astype(str)),
+        "Gérant": np.char.add("Gérant ", rng.integers(1, nb_gerants + 1, nb_operations).astype(str)),
+        "Isin": rng.choice(detenus, nb_operations),
+        "EXEC_PRICE": np.round(rng.uniform(85, 105, nb_operations), 3),
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère des feuilles Runs / Portfolio synthétiques.")
+    parser.add_argument("--lignes", type=int, default=10_000, help="axes par import (défaut : %(default)s)")
+    parser.add_argument("--isins", type=int, help="nombre de titres (défaut : 2 x lignes / dealers)")
+    parser.add_argument("--dealers", type=int, default=12)
+    parser.add_argument("--imports-par-jour", type=int, default=1)
+    parser.add_argument("--jours", type=int, default=1)
+    parser.add_argument("--operations", type=int, help="opérations du portefeuille (défaut : lignes / 10)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sortie", default="BDD_axes_synthetique.xlsx", help="classeur produit (feuilles Runs et Portfolio)")
+    args = parser.parse_args(argv)
+
+    runs = generer_runs(args.lignes, args.isins, args.dealers, args.imports_par_jour, args.jours, seed=args.seed)
+    portefeuille = generer_portefeuille(runs["Isin"], args.operations or max(100, args.lignes // 10), seed=args.seed + 1)
+    with pd.ExcelWriter(args.sortie) as writer:
+        runs.to_excel(writer, sheet_name="Runs", index=False)
+        portefeuille.to_excel(writer, sheet_name="Portfolio", index=False)
+    print(f"{len(runs):,} lignes Runs écrites dans {args.sortie}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
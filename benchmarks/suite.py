@@ -0,0 +1,225 @@
+"""
+Benchmarks des étapes lourdes sur des runs synthétiques (benchmarks/generateur.py) :
+
+    python -m benchmarks.suite                               10k, 100k et 1M lignes
+    python -m benchmarks.suite --tailles 10000,100000 --etapes nettoyage,filtres_index
+    python -m benchmarks.suite --comparer benchmarks/resultats/bench_20250601_120000.json
+
+Chaque étape est répétée (--repetitions, dans la limite de --budget secondes) ; durée médiane
+et minimale, lignes en entrée / en sortie et pic mémoire (--memoire) sont écrits dans un JSON
+horodaté de --sortie, avec la version du code et des bibliothèques, pour comparer les runs.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+import utils.instrumentation as instrumentation
+from benchmarks.generateur import generer_runs, generer_portefeuille
+from utils.best_axe import BestAxeEngine
+from utils.colonnes import colonnes_export
+from utils.courbes import ajuster_courbe, annees_avant_maturite, points_courbe
+from utils.cube_flux import CubeFlux
+from utils.data_cleaning import bucketize_maturity, clean_full_dataframe
+from utils.export import FICHIER_TEMPLATE, LIGNE_DEBUT, excel_bytes
+from utils.filters import compiler_filtres, positions_filtrees
+from utils.index_axes import IndexAxes
+from utils.portfolio_processing import reconstituer_portefeuille
+
+TAILLES = [10_000, 100_000, 1_000_000]
+# Date des runs synthétiques (date_debut du générateur) : durées résiduelles reproductibles
+DATE_REFERENCE = "2025-06-02"
+DOSSIER_RESULTATS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultats")
+
+# Filtres typiques de la page filtrer_les_axes
+ETAT_FILTRES = {
+    "plages": {"AXE_Offer_YLD": (2.0, 6.0), "Maturity": (None, pd.Timestamp("2035-12-31")),
+               "Axe_Mid_Spread": (-1.0, 1.0)},
+    "categories": {"Currency": ["EUR"], "Rating_Category": ["Investment Grade", "Crossover"]},
+    "exclure_144a": True,
+    "tolerance_composite": 1.0,
+}
+
+
+def excel_template_openpyxl(df, path_template=FICHIER_TEMPLATE):
+    """
+    Export Excel d'avant utils/export.excel_bytes, gardé comme référence : le template est
+    chargé en entier et chaque valeur écrite dans sa cellule pré-formatée (ws.cell).
+    """
+    from openpyxl import load_workbook
+    from openpyxl.utils.dataframe import dataframe_to_rows
+    wb = load_workbook(path_template)
+    ws = wb.active
+    df = df.assign(**{col: df[col].dt.date for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])})
+    for i, row in enumerate(dataframe_to_rows(df, index=False, header=False), start=LIGNE_DEBUT):
+        for j, value in enumerate(row, start=1):
+            ws.cell(row=i, column=j, value=value)
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def index_filtres(df, etat=ETAT_FILTRES):
+    """IndexAxes de df avec les index (construits à la demande) des colonnes filtrées par `etat`."""
+    index = IndexAxes(df)
+    for col in etat["plages"]:
+        index.plage(col)
+    for col in etat["categories"]:
+        index.categories(col)
+    return index
+
+
+def _etapes(df_raw, df_trades):
+    """
+    (nom, préparation, fonction) de chaque étape ; la préparation (non chronométrée)
+    renvoie les arguments de la fonction à partir des résultats déjà calculés.
+    """
+    contexte = {}
+
+    def nettoyage():
+        contexte["df_full"], contexte["df_best"], _ = resultat = clean_full_dataframe(df_raw, date_reference=DATE_REFERENCE)
+        return resultat
+
+    def courbe():
+        df_best = contexte["df_best"]
+        ticker = df_best["Ticker"].value_counts().index[0]
+        points = df_best[df_best["Ticker"] == ticker][["Maturity", "AXE_Offer_YLD"]]
+        points = points_courbe(points.assign(X=annees_avant_maturite(points["Maturity"], DATE_REFERENCE)), "AXE_Offer_YLD")
+        return (points["X"].to_numpy(), points["AXE_Offer_YLD"].to_numpy())
+
+    return [
+        ("nettoyage", lambda: (), nettoyage),
+        ("best_axe.moteur", lambda: (contexte["df_full"],), BestAxeEngine),
+        ("best_axe.selection",
+         lambda: (BestAxeEngine(contexte["df_full"]), compiler_filtres(ETAT_FILTRES)(contexte["df_full"])),
+         lambda moteur, masque: moteur.best(masque)),
+        ("filtres_scan", lambda: (contexte["df_best"], ETAT_FILTRES), positions_filtrees),
+        ("filtres_index.construction", lambda: (contexte["df_best"],), index_filtres),
+        ("filtres_index", lambda: (contexte["df_best"], ETAT_FILTRES, index_filtres(contexte["df_best"])),
+         lambda df, etat, index: positions_filtrees(df, etat, index=index)),
+        ("maturite.buckets", lambda: (contexte["df_full"], DATE_REFERENCE), bucketize_maturity),
+        ("flux.cube", lambda: (contexte["df_full"],), CubeFlux),
+        ("portefeuille.reconstitution", lambda: (df_trades,), reconstituer_portefeuille),
+        ("courbes.nelson_siegel", courbe, ajuster_courbe),
+        ("export.excel", lambda: (contexte["df_best"][[c for c in colonnes_export if c in contexte["df_best"].columns]],),
+         excel_bytes),
+        ("export.excel_template", lambda: (contexte["df_best"][[c for c in colonnes_export if c in contexte["df_best"].columns]],),
+         excel_template_openpyxl),
+    ]
+
+
+def mesurer(nom, fonction, arguments, repetitions, budget):
+    """Exécute fonction(*arguments) jusqu'à `repetitions` fois (une seule si le budget est dépassé)."""
+    durees, debut = [], time.perf_counter()
+    for _ in range(repetitions):
+        with instrumentation.etape(f"bench.{nom}", arguments[0] if arguments else None) as mesure:
+            mesure.sortie(fonction(*arguments))
+        durees.append(mesure.duree)
+        if time.perf_counter() - debut > budget:
+            break
+    return {
+        "etape": nom,
+        "lignes_entree": mesure.lignes_entree,
+        "lignes_sortie": mesure.lignes_sortie,
+        "durees_s": [round(d, 6) for d in durees],
+        "mediane_s": round(float(np.median(durees)), 6),
+        "min_s": round(min(durees), 6),
+        "pic_memoire_octets": mesure.pic_memoire,
+    }
+
+
+def _version_code():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def lancer(tailles, etapes=None, repetitions=3, budget=10.0, seed=0):
+    resultats = []
+    for taille in tailles:
+        debut = time.perf_counter()
+        df_raw = generer_runs(taille, seed=seed)
+        df_trades = generer_portefeuille(df_raw["Isin"], taille, seed=seed + 1)
+        print(f"--- {taille:,} lignes (génération {time.perf_counter() - debut:.1f} s)", flush=True)
+        for nom, preparer, fonction in _etapes(df_raw, df_trades):
+            # nettoyage toujours exécuté : les étapes suivantes partent de ses tables
+            if etapes and nom not in etapes and nom != "nettoyage":
+                continue
+            resultat = {"taille": taille, **mesurer(nom, fonction, preparer(), repetitions, budget)}
+            resultats.append(resultat)
+            memoire = (f", pic {resultat['pic_memoire_octets'] / 1e6:,.1f} Mo"
+                       if resultat["pic_memoire_octets"] is not None else "")
+            print(f"{nom:<30}{resultat['mediane_s']:10.4f} s  (min {resultat['min_s']:.4f} s, "
+                  f"{len(resultat['durees_s'])} essai(s){memoire})", flush=True)
+    return resultats
+
+
+def comparer(resultats, reference, memoire=False):
+    """Affiche le rapport des durées médianes (courant / référence) par taille et étape."""
+    avant = {(r["taille"], r["etape"]): r["mediane_s"] for r in reference["resultats"]}
+    print(f"\nComparaison avec {reference.get('commit')} du {reference.get('date')}")
+    if reference.get("memoire_mesuree", False) != memoire:
+        print("Attention : un seul des deux runs mesure la mémoire (tracemalloc), les durées ne sont pas comparables.")
+    for r in resultats:
+        ancien = avant.get((r["taille"], r["etape"]))
+        if ancien:
+            print(f"{r['taille']:>10,} {r['etape']:<30}{ancien:10.4f} s -> {r['mediane_s']:10.4f} s  "
+                  f"x{r['mediane_s'] / ancien:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks des traitements axes sur données synthétiques.")
+    parser.add_argument("--tailles", default=",".join(map(str, TAILLES)), help="lignes Runs par taille testée")
+    parser.add_argument("--etapes", help="étapes à mesurer, séparées par des virgules (défaut : toutes)")
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=10.0, help="secondes au-delà desquelles une étape n'est plus répétée")
+    parser.add_argument("--memoire", action="store_true", help="mesurer le pic mémoire (tracemalloc, plus lent)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sortie", default=DOSSIER_RESULTATS, help="dossier des résultats JSON")
+    parser.add_argument("--comparer", help="résultats JSON d'un run précédent")
+    args = parser.parse_args(argv)
+
+    pd.set_option("mode.copy_on_write", True)
+    instrumentation.FICHIER_JOURNAL = None
+    if args.memoire:
+        instrumentation.activer_trace_memoire()
+
+    tailles = [int(t) for t in args.tailles.split(",") if t.strip()]
+    etapes = {e.strip() for e in args.etapes.split(",")} if args.etapes else None
+    resultats = lancer(tailles, etapes, args.repetitions, args.budget, args.seed)
+
+    horodatage = datetime.now()
+    rapport = {
+        "date": horodatage.isoformat(timespec="seconds"),
+        "commit": _version_code(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "memoire_mesuree": args.memoire,
+        "resultats": resultats,
+    }
+    os.makedirs(args.sortie, exist_ok=True)
+    chemin = os.path.join(args.sortie, f"bench_{horodatage:%Y%m%d_%H%M%S}.json")
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, ensure_ascii=False, indent=2)
+    print(f"Résultats : {chemin}")
+
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as f:
+            comparer(resultats, json.load(f), args.memoire)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+Rapports axes sans interface (tâche planifiée) :
+
+    python cli.py --runs BDD_axes.xlsx --ecrans ecrans_axes.json --sortie exports
+    python cli.py --portefeuille "AM 1" --formats xlsx,parquet
+    python cli.py --courbe BNP --courbe ACAFP --y AXE_Offer_BMK_SPD
+
+Mêmes calculs que l'application (nettoyage, meilleur axe, écrans enregistrés,
+croisement portefeuille, courbes émetteur), sans Streamlit. Chaque étape affiche sa durée
+(et son pic mémoire avec --memoire) ; le détail est ajouté au journal des étapes (utils/instrumentation.py).
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from utils.colonnes import colonnes_export
+from utils.columnar_cache import pyarrow_disponible
+from utils.courbes import courbe_emetteur
+from utils.ecrans import FICHIER_ECRANS, charger_ecrans, evaluer_ecrans
+from utils.export import ecrire_excel, ecrire_csv_gzip, ecrire_parquet
+from utils.instrumentation import etape as etape_instrumentee, activer_trace_memoire
+from utils.portfolio_processing import positions_actives, croiser_axes_portefeuille
+from utils.snapshot import construire_snapshot
+from utils.sources import FICHIER_AXES, lire_runs, lire_portefeuille
+
+EXPORTEURS = {"xlsx": ecrire_excel, "csv.gz": ecrire_csv_gzip, "parquet": ecrire_parquet}
+
+
+@contextmanager
+def etape(nom, durees):
+    """Chronomètre une étape et affiche sa durée (et son pic mémoire si tracemalloc est actif)."""
+    mesure = None
+    try:
+        with etape_instrumentee(f"cli.{nom}") as mesure:
+            yield mesure
+    finally:
+        durees[nom] = mesure.duree
+        memoire = f", pic {mesure.pic_memoire / 1e6:,.1f} Mo" if mesure.pic_memoire is not None else ""
+        print(f"[{durees[nom]:8.3f} s{memoire}] {nom}", flush=True)
+
+
+def _nom_fichier(nom):
+    return re.sub(r"[^\w.-]+", "_", str(nom)).strip("_")
+
+
+def exporter(df, dossier, nom, formats):
+    """Écrit df (colonnes de colonnes_export) dans chacun des formats demandés, bloc par bloc dans le fichier."""
+    df = df[[col for col in colonnes_export if col in df.columns]]
+    chemins = []
+    for format_export in formats:
+        chemin = os.path.join(dossier, f"{_nom_fichier(nom)}.{format_export}")
+        with open(chemin, "wb") as f:
+            EXPORTEURS[format_export](df, f)
+        chemins.append(chemin)
+    return chemins
+
+
+def _formats(valeur):
+    formats = [f.strip() for f in valeur.split(",") if f.strip()]
+    inconnus = [f for f in formats if f not in EXPORTEURS]
+    if inconnus:
+        raise argparse.ArgumentTypeError(f"format(s) inconnu(s) : {', '.join(inconnus)} (choix : {', '.join(EXPORTEURS)})")
+    return formats
+
+
+def construire_parser():
+    parser = argparse.ArgumentParser(description="Exports des axes crédit sans interface.")
+    parser.add_argument("--runs", default=FICHIER_AXES, help="classeur contenant la feuille Runs (défaut : %(default)s)")
+    parser.add_argument("--mode", choices=["columnar", "excel"], default="columnar", help="mode de lecture des runs")
+    parser.add_argument("--sortie", default="exports", help="dossier des fichiers produits (défaut : %(default)s)")
+    parser.add_argument("--formats", type=_formats, default=["xlsx"], help="xlsx, csv.gz, parquet (séparés par des virgules)")
+    parser.add_argument("--sans-best", action="store_true", help="ne pas exporter la table des meilleurs axes")
+    parser.add_argument("--ecrans", nargs="?", const=FICHIER_ECRANS, help="évaluer les écrans enregistrés (défaut : %(const)s)")
+    parser.add_argument("--ecran", action="append", default=[], help="restreindre à cet écran (répétable)")
+    parser.add_argument("--portefeuille", nargs="?", const="", help="croiser avec le portefeuille de cet Asset Manager (tous si vide)")
+    parser.add_argument("--fichier-portefeuille", help="classeur contenant la feuille Portfolio (défaut : --runs)")
+    parser.add_argument("--fonds", action="append", default=[], help="restreindre le portefeuille à ce fonds (répétable)")
+    parser.add_argument("--courbe", action="append", default=[], help="exporter la courbe de ce Ticker (répétable)")
+    parser.add_argument("--y", default="AXE_Offer_YLD", help="mesure des courbes (défaut : %(default)s)")
+    parser.add_argument("--memoire", action="store_true", help="mesurer le pic mémoire de chaque étape (plus lent)")
+    return parser
+
+
+def main(argv=None):
+    args = construire_parser().parse_args(argv)
+    pd.set_option("mode.copy_on_write", True)
+    if args.memoire:
+        activer_trace_memoire()
+
+    formats = args.formats
+    if "parquet" in formats and not pyarrow_disponible():
+        print("pyarrow n'est pas installé : export Parquet ignoré.", file=sys.stderr)
+        formats = [f for f in formats if f != "parquet"]
+    os.makedirs(args.sortie, exist_ok=True)
+
+    durees = {}
+    debut = time.perf_counter()
+
+    with etape("lecture des runs", durees):
+        df_raw = lire_runs(args.runs, mode=args.mode)
+    with etape("nettoyage et meilleur axe", durees):
+        snapshot = construire_snapshot(df_raw)
+    if snapshot.df_full_axes.empty:
+        print("Aucun axe exploitable dans le fichier.", file=sys.stderr)
+        return 1
+    date_import = snapshot.last_import.strftime("%Y%m%d")
+    print(f"Import du {snapshot.last_import:%d/%m/%Y %H:%M} : {len(df_raw):,} lignes brutes, "
+          f"{len(snapshot.df_full_axes):,} axes, {len(snapshot.df_best):,} meilleurs axes")
+
+    if not args.sans_best:
+        with etape("export des meilleurs axes", durees):
+            exporter(snapshot.df_best, args.sortie, f"Axes_export_{date_import}", formats)
+
+    if args.ecrans:
+        ecrans = charger_ecrans(args.ecrans)
+        if args.ecran:
+            absents = [nom for nom in args.ecran if nom not in ecrans]
+            if absents:
+                print(f"Écran(s) introuvable(s) : {', '.join(absents)}", file=sys.stderr)
+            ecrans = {nom: etat for nom, etat in ecrans.items() if nom in args.ecran}
+        with etape(f"évaluation de {len(ecrans)} écran(s)", durees):
+            resultats = evaluer_ecrans(snapshot.df_best, ecrans, index=snapshot.index_best)
+        with etape("export des écrans", durees):
+            for nom, resultat in resultats.items():
+                print(f"  {nom} : {resultat['nb']:,} lignes")
+                exporter(snapshot.df_best.take(resultat["positions"]), args.sortie, f"ecran_{nom}_{date_import}", formats)
+
+    if args.portefeuille is not None:
+        with etape("lecture du portefeuille", durees):
+            df_trades = lire_portefeuille(args.fichier_portefeuille or args.runs)
+        managers = [args.portefeuille] if args.portefeuille else sorted(df_trades["Asset Manager"].dropna().unique())
+        with etape(f"croisement portefeuille ({len(managers)} Asset Manager)", durees):
+            for manager in managers:
+                croise = croiser_axes_portefeuille(snapshot, positions_actives(df_trades, manager, args.fonds))
+                print(f"  {manager} : {len(croise):,} lignes")
+                exporter(croise, args.sortie, f"axes_croises_{manager}_{date_import}", formats)
+
+    for ticker in args.courbe:
+        with etape(f"courbe {ticker}", durees):
+            points, courbe = courbe_emetteur(snapshot.df_best, ticker, y_axis=args.y)
+            points.to_csv(os.path.join(args.sortie, f"courbe_{_nom_fichier(ticker)}_points.csv"), index=False)
+            if courbe is None:
+                print(f"  {ticker} : {len(points)} titre(s), pas assez de points pour une courbe")
+                continue
+            x_lisse, y_lisse, libelle = courbe
+            pd.DataFrame({"X": x_lisse, args.y: y_lisse}).to_csv(
+                os.path.join(args.sortie, f"courbe_{_nom_fichier(ticker)}.csv"), index=False)
+            print(f"  {ticker} : {len(points)} titre(s), {libelle}")
+
+    print(f"Total : {time.perf_counter() - debut:.3f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
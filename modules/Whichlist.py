@@ -1,12 +1,12 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-from utils.display import bouton_retour_accueil, bouton_export_excel
+from utils.display import bouton_retour_accueil, boutons_export, afficher_table_paginee
 from utils.plot import afficher_scatter_parametrable
 from utils.search import search_issuer_or_isin
-from utils.colonnes import colonnes_affichees, colonnes_export
+from utils.colonnes import colonnes_export
 
 def show(df_best_session):
-    df_best = df_best_session.copy()
     bouton_retour_accueil()
     st.markdown("<h2 style='text-align:center; color:orange;'>Wichlist</h2>", unsafe_allow_html=True)
 
@@ -63,13 +63,14 @@ def show(df_best_session):
         st.error(f"❌ La colonne '{colonne_reference}' est absente.")
         return
 
-    df_best = st.session_state.get("df", pd.DataFrame()).copy()
+    df_best = st.session_state.get("df", df_best_session)
     if df_best.empty:
         st.error("⚠️ Aucun axe disponible. Veuillez revenir à l’accueil pour charger les données.")
         return
 
     valeurs_importees = df_import[colonne_reference].dropna().astype(str).str.strip().unique()
-    df_croise = df_best[df_best[colonne_reference].astype(str).str.strip().isin(valeurs_importees)]
+    positions = np.flatnonzero(df_best[colonne_reference].astype(str).str.strip().isin(valeurs_importees).to_numpy())
+    df_croise = df_best.take(positions)
 
     if df_croise.empty:
         st.warning("Aucun axe ne correspond à la liste importée.")
@@ -78,12 +79,14 @@ def show(df_best_session):
     # === Affichage résultats ===
     st.markdown(f"### Axes croisés : {len(df_croise)} ligne(s)")
 
-    colonnes_affichees_finales = [col for col in colonnes_affichees if col in df_croise.columns]
-    st.dataframe(df_croise[colonnes_affichees_finales], use_container_width=True)
+    snapshot = st.session_state.get("snapshot")
+    index = snapshot.index_pour(df_best) if snapshot is not None else None
+    afficher_table_paginee(df_best, positions, index=index, cle="whichlist")
 
-    # Export Excel avec colonnes spécifiques
+    # Exports (Excel, CSV, Parquet) avec colonnes spécifiques
     colonnes_exportables = [col for col in colonnes_export if col in df_croise.columns]
-    bouton_export_excel(df_croise[colonnes_exportables], nom_fichier="axes_croises.xlsx", nom_feuille="Axes croisés")
+    boutons_export(df_croise[colonnes_exportables], nom_fichier="axes_croises.xlsx", nom_feuille="Axes croisés",
+                   version=snapshot.version if index is not None else None)
 
     # === Scatter Plot ===
     st.markdown("### Visualisation des axes")
@@ -1,7 +1,6 @@
 import streamlit as st
-from utils.data_loader import load_mock_data
-from utils.data_cleaning import clean_full_dataframe
-from utils.display import bouton_export_excel, message_legal_axes
+from utils.data_loader import load_axes_data, get_snapshot
+from utils.display import boutons_export, message_legal_axes, afficher_table_paginee
 from utils.colonnes import colonnes_affichees, colonnes_export 
 
 def show():
@@ -31,15 +30,17 @@ def show():
     st.markdown("<h1 style='text-align:center; color:orange;'>Axes Crédit</h1>", unsafe_allow_html=True)
     st.markdown("<p style='text-align:center;'>Bienvenue, sélectionnez une analyse :</p>", unsafe_allow_html=True)
 
-    df_raw = load_mock_data()
+    df_raw = load_axes_data()
     if df_raw.empty:
         st.warning("Aucune donnée trouvée.")
         return
 
-    # Nettoyage complet avec formatage homogène
-    df_full_axes, df_best, last_import = clean_full_dataframe(df_raw)
+    # Nettoyage complet avec formatage homogène (snapshot partagé entre sessions)
+    snapshot = get_snapshot(df_raw)
+    df_full_axes, df_best, last_import = snapshot.df_full_axes, snapshot.df_best, snapshot.last_import
 
-    # Stockage dans session
+    # Références (sans copie) vers le snapshot partagé
+    st.session_state.snapshot = snapshot
     st.session_state.df_full_axes = df_full_axes
     st.session_state.df = df_best
 
@@ -70,11 +71,11 @@ def show():
     st.markdown(f"### Axes du {last_import.strftime('%d/%m/%Y à %H:%M')} ({len(df_best):,} lignes)")
 
     colonnes_visibles = [col for col in colonnes_affichees if col in df_best.columns and col != "Stream_Offer_Price"]
-    st.dataframe(df_best[colonnes_visibles], use_container_width=True)
+    afficher_table_paginee(df_best, colonnes=colonnes_visibles, index=snapshot.index_best, cle="accueil")
 
-    # Export Excel avec colonnes spécifiques
+    # Exports (Excel, CSV, Parquet) avec colonnes spécifiques
     colonnes_exportables = [col for col in colonnes_export if col in df_best.columns]
-    bouton_export_excel(df_best[colonnes_exportables], nom_fichier=f"Axes_export_{last_import.strftime('%Y%m%d')}.xlsx", nom_feuille="Axes")
+    boutons_export(df_best[colonnes_exportables], nom_fichier=f"Axes_export_{last_import.strftime('%Y%m%d')}.xlsx", nom_feuille="Axes", version=snapshot.version)
 
     # Avertissement légal
     message_legal_axes()
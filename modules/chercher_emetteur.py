@@ -3,24 +3,23 @@ import pandas as pd
 import plotly.graph_objects as go
 import numpy as np
 from utils.search import search_issuer_or_isin
-from scipy.optimize import curve_fit
-from scipy.interpolate import UnivariateSpline
+from utils.courbes import est_subordonnee, annees_avant_maturite, ajuster_courbe, points_courbe
+from utils.data_cleaning import buckets_maturite
 from utils.display import bouton_retour_accueil
 
-def nelson_siegel(x, beta0, beta1, beta2, tau):
-    term1 = beta0
-    term2 = beta1 * (1 - np.exp(-x / tau)) / (x / tau)
-    term3 = beta2 * ((1 - np.exp(-x / tau)) / (x / tau) - np.exp(-x / tau))
-    return term1 + term2 + term3
-
 def show(df_best):
     bouton_retour_accueil()
     st.markdown("<h2 style='text-align:center; color:orange;'>Chercher un émetteur</h2>", unsafe_allow_html=True)
 
-    df = df_best.copy()
+    # Copie superficielle : les colonnes ajoutées ci-dessous ne touchent pas le snapshot partagé
+    df = df_best.copy(deep=False)
     df["Maturity"] = pd.to_datetime(df["Maturity"], errors="coerce")
-    df["Années avant maturité"] = (df["Maturity"] - pd.Timestamp.now()).dt.days / 365
-    df["SUB"] = df["Bond ID"].astype(str).str.endswith("SUB") | df["Bond ID"].astype(str).str.endswith("SUB}")
+    # Durée résiduelle et bucket calculés au nettoyage (date de référence du snapshot)
+    if "Années avant maturité" not in df.columns:
+        df["Années avant maturité"] = annees_avant_maturite(df["Maturity"])
+    if "MaturityBucket" not in df.columns:
+        df["MaturityBucket"] = buckets_maturite(df["Années avant maturité"])
+    df["SUB"] = est_subordonnee(df["Bond ID"])
 
     # Ajout colonne Année de maturité
     df["Année de maturité"] = df["Maturity"].dt.year
@@ -127,35 +126,21 @@ def show(df_best):
             df_filtered["ISIN"],
             df_filtered["Bond ID"],
             df_filtered["Maturity"].dt.strftime("%d/%m/%Y"),
-            df_filtered[y_axis]
+            df_filtered[y_axis],
+            df_filtered["MaturityBucket"].astype(str)
         ], axis=-1),
         hovertemplate=(
             "<b>%{customdata[1]}</b><br>" +
             f"{y_axis} : " + "%{customdata[3]:.2f}<br>" +
-            "<span style='font-size:11px; color:gray;'>%{customdata[0]} – %{customdata[2]}</span><extra></extra>"
+            "<span style='font-size:11px; color:gray;'>%{customdata[0]} – %{customdata[2]} (%{customdata[4]})</span><extra></extra>"
         )
     ))
 
     # Courbe
-    df_curve = df_filtered[["X", y_axis]].dropna().sort_values("X").drop_duplicates(subset="X")
+    df_curve = points_courbe(df_filtered, y_axis)
 
     if len(df_curve) >= 2:
-        x_vals = df_curve["X"].values
-        y_vals = df_curve[y_axis].values
-        x_smooth = np.linspace(x_vals.min(), x_vals.max(), 300)
-
-        try:
-            if len(x_vals) >= 4:
-                popt, _ = curve_fit(nelson_siegel, x_vals, y_vals, maxfev=10000)
-                y_smooth = nelson_siegel(x_smooth, *popt)
-                label = "Courbe interpolée (Nelson-Siegel)"
-            else:
-                spline = UnivariateSpline(x_vals, y_vals, k=3, s=0.5)
-                y_smooth = spline(x_smooth)
-                label = "Courbe lissée (Spline cubique)"
-        except Exception:
-            y_smooth = np.interp(x_smooth, x_vals, y_vals)
-            label = "Courbe linéaire"
+        x_smooth, y_smooth, label = ajuster_courbe(df_curve["X"].values, df_curve[y_axis].values)
 
         x_smooth_display = x_smooth if x_choice == "Années avant maturité" else current_year + x_smooth
 
@@ -0,0 +1,63 @@
+import tracemalloc
+
+import pandas as pd
+import streamlit as st
+from utils.data_loader import load_axes_data, rapport_memoire_axes, get_cache_filtres, get_cache_exports
+from utils.demarrage import durees_import
+from utils.instrumentation import FICHIER_JOURNAL, mesures, vider_mesures
+
+
+def _resume_etapes(df_mesures):
+    """Une ligne par étape : nombre d'appels, durées (totale, moyenne, p95, max), pic mémoire max."""
+    resume = df_mesures.groupby("etape").agg(
+        Appels=("duree_s", "size"),
+        Total_s=("duree_s", "sum"),
+        Moyenne_s=("duree_s", "mean"),
+        P95_s=("duree_s", lambda d: d.quantile(0.95)),
+        Max_s=("duree_s", "max"),
+        Pic_memoire_Mo=("pic_memoire_octets", lambda m: m.max() / 1e6),
+    )
+    return resume.sort_values("Total_s", ascending=False)
+
+
+def _caption_cache(nom, stats):
+    st.caption(f"{nom} : {stats['entrees']} entrées, {stats['octets'] / 1e6:,.1f} Mo, "
+               f"{stats['hits']} hits / {stats['misses']} misses ({stats['taux_hit']:.0%}), "
+               f"{stats['evictions']} évictions")
+
+
+def show():
+    """Panneau caché (URL ?debug=1) : mesures des étapes, mémoire des données, caches, imports."""
+    with st.expander("Debug : instrumentation", expanded=True):
+        # tracemalloc est global au process : il n'est pas piloté depuis une session
+        etat_trace = "actif" if tracemalloc.is_tracing() else "inactif"
+        st.caption(f"Pic mémoire des étapes (tracemalloc) : {etat_trace}. Réglage global au process, "
+                   "à fixer au lancement avec AXES_TRACE_MEMOIRE=1 (ralentit toutes les sessions).")
+
+        df_mesures = pd.DataFrame(mesures())
+        if df_mesures.empty:
+            st.caption("Aucune étape mesurée pour l'instant.")
+        else:
+            st.markdown("#### Étapes")
+            st.dataframe(_resume_etapes(df_mesures), use_container_width=True)
+            st.markdown(f"#### Dernières mesures ({len(df_mesures)}, journal : `{FICHIER_JOURNAL}`)")
+            st.dataframe(df_mesures.iloc[::-1], use_container_width=True, hide_index=True)
+        if st.button("Vider les mesures"):
+            vider_mesures()
+            st.rerun()
+
+        st.markdown("#### Mémoire des données")
+        if st.checkbox("Calculer le gain du schéma compact"):
+            df_raw = load_axes_data()
+            if not df_raw.empty:
+                rapport = rapport_memoire_axes(df_raw)
+                st.markdown(f"{rapport['Avant'].sum() / 1e6:,.1f} Mo → {rapport['Après'].sum() / 1e6:,.1f} Mo "
+                            f"({rapport['Gain'].sum() / 1e6:,.1f} Mo économisés)")
+                st.dataframe(rapport, use_container_width=True)
+
+        _caption_cache("Cache des filtres", get_cache_filtres().stats())
+        _caption_cache("Cache des exports", get_cache_exports().stats())
+        imports = durees_import()
+        if imports:
+            st.caption("Premier import des pages : " + ", ".join(
+                f"{nom.rsplit('.', 1)[-1]} {duree * 1000:,.0f} ms" for nom, duree in imports.items()))
@@ -1,54 +1,98 @@
 import streamlit as st
 import pandas as pd
 import datetime
-from utils.filters import get_slider_range
+from utils.filters import get_slider_range, positions_filtrees
+from utils.data_loader import get_cache_filtres
+from utils.ecrans import charger_ecrans, sauvegarder_ecran, supprimer_ecran, evaluer_ecrans
 from utils.plot import afficher_scatter_parametrable
 from utils.search import search_issuer_or_isin
-from utils.display import bouton_retour_accueil, bouton_export_excel
-from utils.colonnes import colonnes_affichees, colonnes_export 
+from utils.display import bouton_retour_accueil, boutons_export, afficher_table_paginee
+from utils.colonnes import colonnes_export 
+
+
+def afficher_ecrans(df, etat_filtres, index, version=None):
+    """
+    Enregistrement des filtres courants et évaluation groupée des écrans sauvegardés.
+    Positions mises en cache par (version, prédicats normalisés) : un rerun ne réévalue
+    que les écrans nouveaux ou modifiés.
+    """
+    with st.expander("Écrans enregistrés"):
+        col_nom, col_btn = st.columns([3, 1])
+        with col_nom:
+            nom = st.text_input("Nom de l'écran", placeholder="EUR IG FIN 3-7Y")
+        with col_btn:
+            if st.button("Enregistrer les filtres", disabled=not nom.strip()):
+                sauvegarder_ecran(nom.strip(), etat_filtres)
+                st.success(f"Écran « {nom.strip()} » enregistré.")
+
+        ecrans = charger_ecrans()
+        if not ecrans:
+            st.info("Aucun écran enregistré.")
+            return
+
+        resultats = evaluer_ecrans(df, ecrans, index=index, cache=get_cache_filtres(), version=version)
+        st.dataframe(pd.DataFrame({"Écran": list(resultats), "Lignes": [r["nb"] for r in resultats.values()]}),
+                     use_container_width=True, hide_index=True)
+
+        ecran = st.selectbox("Afficher un écran", [""] + list(resultats))
+        if ecran:
+            afficher_table_paginee(df, resultats[ecran]["positions"], index=index, cle="ecran")
+            if st.button("Supprimer cet écran"):
+                supprimer_ecran(ecran)
+                st.rerun()
 
 
 def show(df):
     bouton_retour_accueil()
     st.markdown("<h2 style='text-align:center; color:orange;'>Filtrer les axes</h2>", unsafe_allow_html=True)
 
-    df = st.session_state.get("df", df).copy()
+    df = st.session_state.get("df", df)
+
+    # Index du snapshot : min/max, plages et options précalculés sans parcourir les colonnes
+    snapshot = st.session_state.get("snapshot")
+    index = snapshot.index_pour(df) if snapshot is not None else None
+
+    def colonne(col):
+        return index.plage(col) if index is not None else df[col]
+
+    def options(col):
+        return index.options(col) if index is not None else sorted(df[col].dropna().unique())
 
     st.markdown("### Filtres")
     col1, col2, col3 = st.columns(3)
 
     with col1:
         st.markdown("##### Critères qualitatifs")
-        selected_sectors = st.multiselect("Secteurs", sorted(df["Sector"].dropna().unique()))
-        selected_currencies = st.multiselect("Devises", sorted(df["Currency"].dropna().unique()))
-        selected_ratings = st.multiselect("Notation crédit", sorted(df["Rating_Category"].dropna().unique()))
-        selected_tickers = st.multiselect("Filtrer par Ticker", sorted(df["Ticker"].dropna().unique()))
-        selected_dealers = st.multiselect("Filtrer par Dealer", sorted(df["Best_Dealer"].dropna().unique()))
+        selected_sectors = st.multiselect("Secteurs", options("Sector"))
+        selected_currencies = st.multiselect("Devises", options("Currency"))
+        selected_ratings = st.multiselect("Notation crédit", options("Rating_Category"))
+        selected_tickers = st.multiselect("Filtrer par Ticker", options("Ticker"))
+        selected_dealers = st.multiselect("Filtrer par Dealer", options("Best_Dealer"))
 
     with col2:
         st.markdown("##### Critères quantitatifs")
-        yld_min, yld_max = get_slider_range(df["AXE_Offer_YLD"])
+        yld_min, yld_max = get_slider_range(colonne("AXE_Offer_YLD"))
         yld_range = st.slider("Yield (%)", yld_min, yld_max, (yld_min, yld_max))
 
-        bmk_min, bmk_max = get_slider_range(df["AXE_Offer_BMK_SPD"])
+        bmk_min, bmk_max = get_slider_range(colonne("AXE_Offer_BMK_SPD"))
         bmk_range = st.slider("Spread BMK (bps)", bmk_min, bmk_max, (bmk_min, bmk_max))
         
-        dealer_min, dealer_max = get_slider_range(df["Nb_Dealers_AXE"])
+        dealer_min, dealer_max = get_slider_range(colonne("Nb_Dealers_AXE"))
         dealer_min = int(dealer_min)
         dealer_max = int(dealer_max)
         dealer_range = st.slider ("Nb Dealers", dealer_min, dealer_max, (dealer_min, dealer_max), step=1)
 
-        qty_min, qty_max = get_slider_range(df["AXE_Offer_QTY"])
+        qty_min, qty_max = get_slider_range(colonne("AXE_Offer_QTY"))
         qty_min_input = st.number_input("Quantité minimum", qty_min, qty_max, value=qty_min)
         qty_max_input = st.number_input("Quantité maximum", qty_min_input, qty_max, value=qty_max)
 
     with col3:
         st.markdown("##### Options avancées")
-        axe_min, axe_max = get_slider_range(df["Axe_Mid_Spread"])
+        axe_min, axe_max = get_slider_range(colonne("Axe_Mid_Spread"))
         axe_spread_range = st.slider("Axe vs Mid", axe_min, axe_max, (axe_min, axe_max))
 
-        df["comp_gap"] = (df["Composite_Offer_Price"] - df["Composite_Bid_Price"]).abs()
-        tol_max = round(min(df["comp_gap"].max() + 0.1, 5.0), 2)
+        comp_gap = (df["Composite_Offer_Price"] - df["Composite_Bid_Price"]).abs()
+        tol_max = round(min(comp_gap.max() + 0.1, 5.0), 2)
         tol = st.slider("Marge autour du Bid/Offer Composite (± points)", 0.0, tol_max, value=tol_max, step=0.01)
 
         exclude_144a = st.checkbox("Exclure les titres 144A")
@@ -62,8 +106,8 @@ def show(df):
         streamlit_min = datetime.date(1970, 1, 1)
         streamlit_max = datetime.date(2100, 12, 31)
         
-        min_maturity = safe_date(df["Maturity"].min())
-        max_maturity = safe_date(df["Maturity"].max())
+        min_maturity = safe_date(pd.Timestamp(colonne("Maturity").min()))
+        max_maturity = safe_date(pd.Timestamp(colonne("Maturity").max()))
         
         safe_min = max(min_maturity, streamlit_min)
         safe_max = min(max_maturity, streamlit_max)
@@ -72,72 +116,53 @@ def show(df):
         maturity_max = st.date_input("Maturité max", safe_max, min_value=maturity_min, max_value=streamlit_max)
 
     # === Filtrage dynamique sans exclure les NaN tant que non modifié ===
-    filtered_df = df.copy()
-
+    plages = {}
     if yld_range != (yld_min, yld_max):
-        filtered_df = filtered_df[
-            filtered_df["AXE_Offer_YLD"].notna() &
-            filtered_df["AXE_Offer_YLD"].between(*yld_range)
-        ]
-
+        plages["AXE_Offer_YLD"] = yld_range
     if bmk_range != (bmk_min, bmk_max):
-        filtered_df = filtered_df[
-            filtered_df["AXE_Offer_BMK_SPD"].notna() &
-            filtered_df["AXE_Offer_BMK_SPD"].between(*bmk_range)
-        ]
-        
+        plages["AXE_Offer_BMK_SPD"] = bmk_range
     if dealer_range != (dealer_min, dealer_max):
-        filtered_df = filtered_df[
-            filtered_df["Nb_Dealers_AXE"].notna() &
-            filtered_df["Nb_Dealers_AXE"].between(*dealer_range)
-        ]
-
+        plages["Nb_Dealers_AXE"] = dealer_range
     if (qty_min_input != qty_min) or (qty_max_input != qty_max):
-        filtered_df = filtered_df[
-            filtered_df["AXE_Offer_QTY"].notna() &
-            filtered_df["AXE_Offer_QTY"].between(qty_min_input, qty_max_input)
-        ]
-
+        plages["AXE_Offer_QTY"] = (qty_min_input, qty_max_input)
     if axe_spread_range != (axe_min, axe_max):
-        filtered_df = filtered_df[
-            filtered_df["Axe_Mid_Spread"].notna() &
-            filtered_df["Axe_Mid_Spread"].between(*axe_spread_range)
-        ]
-
+        plages["Axe_Mid_Spread"] = axe_spread_range
     if (maturity_min != safe_min) or (maturity_max != safe_max):
-        filtered_df = filtered_df[
-            filtered_df["Maturity"].notna() &
-            filtered_df["Maturity"].between(maturity_min, maturity_max)
-        ]
-
-    # === Filtres qualitatifs ===
-    if selected_sectors:
-        filtered_df = filtered_df[filtered_df["Sector"].isin(selected_sectors)]
-    if selected_currencies:
-        filtered_df = filtered_df[filtered_df["Currency"].isin(selected_currencies)]
-    if selected_ratings:
-        filtered_df = filtered_df[filtered_df["Rating_Category"].isin(selected_ratings)]
-    if selected_tickers:
-        filtered_df = filtered_df[filtered_df["Ticker"].isin(selected_tickers)]
-    if selected_dealers:
-        filtered_df = filtered_df[filtered_df["Best_Dealer"].isin(selected_dealers)]
-    if exclude_144a:
-        filtered_df = filtered_df[~filtered_df["Bond ID"].astype(str).str.contains("144A")]
-  
-    # === Tolérance composite ===
-    filtered_df = filtered_df[
-        (filtered_df["AXE_Offer_Price"] >= filtered_df["Composite_Bid_Price"] - tol) &
-        (filtered_df["AXE_Offer_Price"] <= filtered_df["Composite_Offer_Price"] + tol)
-    ]
-
-    st.markdown(f"### Résultats filtrés ({len(filtered_df)} lignes)")
-
-    colonnes_affichees_finales = [col for col in colonnes_affichees if col in filtered_df.columns]
-    st.dataframe(filtered_df[colonnes_affichees_finales], use_container_width=True)
-
-    # Export Excel avec colonnes spécifiques
+        plages["Maturity"] = (maturity_min, maturity_max)
+
+    etat_filtres = {
+        "plages": plages,
+        "categories": {
+            "Sector": selected_sectors,
+            "Currency": selected_currencies,
+            "Rating_Category": selected_ratings,
+            "Ticker": selected_tickers,
+            "Best_Dealer": selected_dealers,
+        },
+        "exclure_144a": exclude_144a,
+        "tolerance_composite": tol,
+    }
+
+    # Un seul masque combiné, une seule matérialisation ; positions mises en cache par
+    # (version du snapshot, état normalisé) pour les écrans déjà consultés
+    version = (snapshot.version, "df_best" if df is snapshot.df_best else "df_full_axes") if index is not None else None
+    if index is not None:
+        positions = positions_filtrees(df, etat_filtres, index=index, cache=get_cache_filtres(), version=version)
+    else:
+        positions = positions_filtrees(df, etat_filtres)
+    filtered_df = df.take(positions)
+
+    st.markdown(f"### Résultats filtrés ({len(positions)} lignes)")
+
+    # Seule la page visible est envoyée au navigateur
+    afficher_table_paginee(df, positions, index=index, cle="filtrer")
+
+    # Exports (Excel, CSV, Parquet) avec colonnes spécifiques
     colonnes_exportables = [col for col in colonnes_export if col in filtered_df.columns]
-    bouton_export_excel(filtered_df[colonnes_exportables], nom_fichier="Axes_export.xlsx", nom_feuille="Axes")
+    boutons_export(filtered_df[colonnes_exportables], nom_fichier="Axes_export.xlsx", nom_feuille="Axes",
+                   version=snapshot.version if index is not None else None)
+
+    afficher_ecrans(df, etat_filtres, index, version)
 
     st.markdown("### Clustering des résultats filtrés")
     afficher_scatter_parametrable(filtered_df)
@@ -1,12 +1,15 @@
 import streamlit as st
 import pandas as pd
 import datetime
-from utils.display import bouton_retour_accueil, bouton_export_excel
+from utils.display import bouton_retour_accueil, boutons_export, date_affichee
 from utils.plot import afficher_scatter_parametrable
 from utils.filters import get_slider_range
-from utils.portfolio_processing import reconstituer_portefeuille, get_qty_nette_by_fonds
+from utils.portfolio_processing import (reconstituer_portefeuille, get_qty_nette_by_fonds,
+                                        aggreger_portefeuille, croiser_axes_portefeuille)
+from utils.best_axe import axes_par_dealer
 from utils.data_loader import load_mock_portfolio
 from utils.colonnes import colonnes_affichees, colonnes_export
+from utils.instrumentation import etape
 
 def show(df_best_session):
     bouton_retour_accueil()
@@ -25,12 +28,13 @@ def show(df_best_session):
     if not am_selected:
         return
 
-    df_am = df_trades[df_trades["Asset Manager"] == am_selected].copy()
-    df_am["Date"] = pd.to_datetime(df_am["Date"], errors="coerce")
-    df_am["Qty"] = pd.to_numeric(df_am["Qty"], errors="coerce")
-    df_am["Sens"] = df_am["Sens"].str.lower().str.strip()
-    df_am["Fonds"] = df_am["Fonds"].astype(str).str.strip()
-    df_am = df_am.dropna(subset=["Qty", "Date", "Fonds", "ISIN"])
+    with etape("portfolio.operations_asset_manager", df_trades) as mesure:
+        df_am = df_trades[df_trades["Asset Manager"] == am_selected].copy()
+        df_am["Date"] = pd.to_datetime(df_am["Date"], errors="coerce")
+        df_am["Qty"] = pd.to_numeric(df_am["Qty"], errors="coerce")
+        df_am["Sens"] = df_am["Sens"].str.lower().str.strip()
+        df_am["Fonds"] = df_am["Fonds"].astype(str).str.strip()
+        df_am = mesure.sortie(df_am.dropna(subset=["Qty", "Date", "Fonds", "ISIN"]))
 
     st.markdown("### Filtres portefeuille")
     col1, col2 = st.columns([1, 1.2])
@@ -60,25 +64,12 @@ def show(df_best_session):
 
         portefeuille = portefeuille[portefeuille["Qty_Nette"] > 0]
 
-        df_axes = st.session_state.get("df_full_axes", pd.DataFrame()).copy()
-        df_axes = df_axes[df_axes["ISIN"].isin(portefeuille["ISIN"])]
+        # Meilleur axe des ISIN en portefeuille, lu dans l'état précalculé du snapshot
+        with etape("portfolio.meilleur_axe_positions", portefeuille) as mesure:
+            best_engine = st.session_state.snapshot.best_engine
+            df_best = best_engine.best(isins=portefeuille["ISIN"])
 
-        nb_dealers = df_axes.groupby("ISIN")["Dealer"].nunique()
-        df_valid = df_axes[df_axes["AXE_Offer_QTY"] > 0].copy()
-        idx = df_valid.groupby("ISIN")["AXE_Offer_YLD"].idxmax()
-        df_best = df_axes.loc[idx].copy()
-        df_best.rename(columns={"Dealer": "Best_Dealer"}, inplace=True)
-        df_best["Nb_Dealers_AXE"] = df_best["ISIN"].map(nb_dealers)
-        df_best = df_best[~((df_best["AXE_Offer_QTY"].fillna(0) == 0) & (df_best["Nb_Dealers_AXE"] == 1))]
-
-        portefeuille_aggrege = portefeuille.groupby("ISIN", as_index=False).agg({
-            "Qty_Nette": "sum",
-            "Dernier_Sens": "last",
-            "Date_Derniere_Op": "max",
-            "Nb_Operations": "sum"
-        })
-
-        df_best = df_best.merge(portefeuille_aggrege, on="ISIN", how="inner")
+            df_best = mesure.sortie(df_best.merge(aggreger_portefeuille(portefeuille), on="ISIN", how="inner"))
 
         if "Qty_Nette" in df_best.columns and not df_best.empty:
             qty_par_isin = df_best.groupby("ISIN", as_index=False)["Qty_Nette"].sum()
@@ -94,12 +85,10 @@ def show(df_best_session):
     # === Filtres AXES ===
     st.markdown("### Filtres sur les axes")
     
-    df_axes = st.session_state.get("df_full_axes", pd.DataFrame()).copy()
-    df_axes = df_axes[df_axes["ISIN"].isin(portefeuille["ISIN"])].copy()
-    df_axes["Maturity"] = pd.to_datetime(df_axes["Maturity"], errors="coerce")
-    for col in ["AXE_Offer_YLD", "AXE_Offer_BMK_SPD", "AXE_Offer_QTY", "Axe_Mid_Spread",
-                "Composite_Bid_Price", "Composite_Offer_Price"]:
-        df_axes[col] = pd.to_numeric(df_axes[col], errors="coerce")
+    # Vue sur le snapshot partagé : Maturity et colonnes numériques sont déjà typées au nettoyage
+    df_full = st.session_state.get("df_full_axes", pd.DataFrame())
+    masque_portefeuille = df_full["ISIN"].isin(portefeuille["ISIN"])
+    df_axes = df_full[masque_portefeuille]
     
     col1, col2 = st.columns(2)
     with col1:
@@ -123,39 +112,23 @@ def show(df_best_session):
             max_value=max_date_possible
         )
     
-    # Filtres actifs uniquement si modifiés
-    filtered_axes = df_axes.copy()
+    # Filtres actifs uniquement si modifiés, compilés en un masque sur df_full_axes
+    plages = {}
     if yld_range != (yld_min, yld_max):
-        filtered_axes = filtered_axes[filtered_axes["AXE_Offer_YLD"].between(*yld_range)]
+        plages["AXE_Offer_YLD"] = yld_range
     if bmk_range != (bmk_min, bmk_max):
-        filtered_axes = filtered_axes[filtered_axes["AXE_Offer_BMK_SPD"].between(*bmk_range)]
+        plages["AXE_Offer_BMK_SPD"] = bmk_range
     if qty_min_input > qty_min:
-        filtered_axes = filtered_axes[filtered_axes["AXE_Offer_QTY"] >= qty_min_input]
+        plages["AXE_Offer_QTY"] = (qty_min_input, None)
     if axe_range != (axe_min, axe_max):
-        filtered_axes = filtered_axes[filtered_axes["Axe_Mid_Spread"].between(*axe_range)]
-    
-    filtered_axes = filtered_axes[
-        (filtered_axes["Maturity"].dt.date <= maturity_max) &
-        (filtered_axes["AXE_Offer_Price"] >= filtered_axes["Composite_Bid_Price"] - tol) &
-        (filtered_axes["AXE_Offer_Price"] <= filtered_axes["Composite_Offer_Price"] + tol)
-    ]
-    
-    # Recalcul df_best croisé avec portefeuille
-    nb_dealers = filtered_axes.groupby("ISIN")["Dealer"].nunique()
-    df_valid = filtered_axes[filtered_axes["AXE_Offer_QTY"] > 0].copy()
-    idx = df_valid.groupby("ISIN")["AXE_Offer_YLD"].idxmax()
-    df_best = filtered_axes.loc[idx].copy()
-    df_best.rename(columns={"Dealer": "Best_Dealer"}, inplace=True)
-    df_best["Nb_Dealers_AXE"] = df_best["ISIN"].map(nb_dealers)
-    df_best = df_best[~((df_best["AXE_Offer_QTY"].fillna(0) == 0) & (df_best["Nb_Dealers_AXE"] == 1))]
+        plages["Axe_Mid_Spread"] = axe_range
+    # Maturity.dt.date <= maturity_max
+    plages["Maturity"] = (None, pd.Timestamp(maturity_max) + pd.Timedelta(days=1) - pd.Timedelta(1, "ns"))
+
+    etat_filtres = {"plages": plages, "tolerance_composite": tol}
     
-    portefeuille_aggrege = portefeuille.groupby("ISIN", as_index=False).agg({
-        "Qty_Nette": "sum",
-        "Dernier_Sens": "last",
-        "Date_Derniere_Op": "max",
-        "Nb_Operations": "sum"
-    })
-    df_best = df_best.merge(portefeuille_aggrege, on="ISIN", how="inner")
+    # Recalcul df_best croisé avec portefeuille, sur les seules lignes retenues
+    df_best = croiser_axes_portefeuille(st.session_state.snapshot, portefeuille, etat_filtres)
     
     if "Maturity" in df_best.columns:
         df_best["Maturity"] = pd.to_datetime(df_best["Maturity"], errors="coerce").dt.strftime("%Y/%m/%d")
@@ -167,7 +140,7 @@ def show(df_best_session):
     st.dataframe(df_best[colonnes_affichees_finales], use_container_width=True)
 
     colonnes_exportables = [col for col in colonnes_export if col in df_best.columns]
-    bouton_export_excel(df_best[colonnes_exportables], nom_fichier="axes_croises.xlsx", nom_feuille="Axes croisés")
+    boutons_export(df_best[colonnes_exportables], nom_fichier="axes_croises.xlsx", nom_feuille="Axes croisés")
         
     st.markdown("### Visualisation des axes")
     afficher_scatter_parametrable(df_best)
@@ -196,14 +169,14 @@ def show(df_best_session):
                     "Bond ID": bond.get("Bond ID"),
                     "Émetteur": bond.get("IssuerName"),
                     "ISIN": bond.get("ISIN"),
-                    "Maturité": bond.get("Maturity"),
+                    "Maturité": date_affichee(bond.get("Maturity")),
                     "Devise": bond.get("Currency"),
                     "Coupon": bond.get("Coupon"),
                     "CouponType": bond.get("CouponType"),
                     "Secteur": bond.get("Sector"),
                     "Notation Moody's": bond.get("Moody's_rating")
                 }
-                st.table(pd.DataFrame.from_dict(infos, orient='index', columns=["Valeur"]))
+                st.table(pd.DataFrame.from_dict(infos, orient='index', columns=["Valeur"]).astype("string"))
 
                 summary_df, detail_dict = get_qty_nette_by_fonds(df_filtered, selected_isin)
                 summary_df = summary_df[summary_df["Qty_Nette"] > 0]
@@ -231,8 +204,7 @@ def show(df_best_session):
                             st.dataframe(all_details[colonnes], use_container_width=True)
 
                 dealer_col = "Dealer" if "Dealer" in subset.columns else "Best_Dealer"
-                subset_sorted = subset.sort_values(by="Axe_Mid_Spread", ascending=True)
-                subset_unique = subset_sorted.drop_duplicates(subset=[dealer_col, "ISIN"], keep="first")
+                subset_unique = axes_par_dealer(subset)
 
                 colonnes = [
                     dealer_col, "AXE_Offer_Price", "AXE_Offer_YLD","AXE_Offer_BMK_SPD","AXE_Offer_QTY",
@@ -287,4 +259,4 @@ def show(df_best_session):
         st.error("Les données complètes ne sont pas chargées. Veuillez revenir à l'accueil.")
 
 
-    
\ No newline at end of file
+    
@@ -0,0 +1,158 @@
+"""
+Parité des passes vectorisées de clean_full_dataframe avec les versions ligne à ligne
+qu'elles remplacent (classify_rating_category, lambda des secteurs IG), et de
+clean_full_dataframe complet avec sa version d'origine (tests/nettoyage_reference.py).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import nettoyage_reference as reference
+from benchmarks.generateur import generer_runs
+from utils.data_cleaning import (classify_rating_categories, classify_rating_category, classify_sectors,
+                                 clean_full_dataframe)
+
+# Colonnes ajoutées depuis la version d'origine (absentes de la référence)
+COLONNES_AJOUTEES = ["Zone Composite", "Années avant maturité", "MaturityBucket"]
+
+# Valeurs limites : manquantes, non textuelles, casse mélangée, espaces, notations invalides
+NOTATIONS = [
+    "AAA", "aa-", "Aa1", " A+ ", "a3", "BBB-", "Baa2", "bb+", "B", "b2", "Ba1", "CCC", "Caa3", "C",
+    "WD", "wd", "NR", "nr", "WR", "N/A", "Not Rated", "NAN", "nan", "", " ", "XYZ",
+    None, np.nan, 5, 3.0, True,
+]
+
+
+def _ancienne_categorie_secteur(row):
+    # Lambda d'origine de clean_full_dataframe
+    return ("IG FIN" if isinstance(row["Sub_Sector"], str) and row["Sub_Sector"].startswith("IG") and any(
+                x in row["Sub_Sector"] for x in ["CoCo", "Lower Tier", "Upper T2", "SnBnk"])
+            else "IG CORPO" if isinstance(row["Sub_Sector"], str) and row["Sub_Sector"].startswith("IG")
+            else row["Sector"])
+
+
+def _toutes_les_paires():
+    fitch, moodys = zip(*[(f, m) for f in NOTATIONS for m in NOTATIONS])
+    return pd.DataFrame({"FitchRating": list(fitch), "Moody's_rating": list(moodys)}, dtype=object)
+
+
+def test_classify_rating_categories_parite():
+    df = _toutes_les_paires()
+    attendu = df.apply(classify_rating_category, axis=1)
+    pd.testing.assert_series_equal(classify_rating_categories(df), attendu, check_names=False)
+
+
+def test_classify_rating_categories_colonnes_categorielles():
+    # Tables compactées (utils/colonnes.schema_axes) : notations en category
+    df = _toutes_les_paires()
+    df_cat = df.assign(**{col: df[col].astype(str).where(df[col].notna()).astype("category") for col in df.columns})
+    attendu = df_cat.apply(classify_rating_category, axis=1)
+    resultat = classify_rating_categories(df_cat)
+    pd.testing.assert_series_equal(resultat.astype(object), attendu.astype(object), check_names=False)
+
+
+@pytest.mark.parametrize("colonne_absente", ["FitchRating", "Moody's_rating"])
+def test_classify_rating_categories_colonne_absente(colonne_absente):
+    df = _toutes_les_paires().drop(columns=colonne_absente)
+    attendu = df.apply(classify_rating_category, axis=1)
+    pd.testing.assert_series_equal(classify_rating_categories(df), attendu, check_names=False)
+
+
+def test_classify_sectors_parite():
+    sous_secteurs = pd.Series([
+        "IG - SnBnk/Fin", "IG - Lower Tier 2", "IG CoCo", "IG - Upper T2", "IG - Industrial",
+        "ig - SnBnk/Fin", "IG", "IGX CoCo", "HY - Energy", "HY-Telecom", "EM - Sovereign",
+        "Lower Tier IG", "", " IG - Telecom", None, np.nan, 5, 3.0,
+    ], dtype=object)
+    df = pd.DataFrame({"Sub_Sector": sous_secteurs})
+    df["Sector"] = df["Sub_Sector"].str.extract(r'^([^ -]+)')
+    attendu = df.apply(_ancienne_categorie_secteur, axis=1)
+    resultat = classify_sectors(df["Sub_Sector"], df["Sector"])
+    pd.testing.assert_series_equal(resultat.fillna(np.nan), attendu.fillna(np.nan), check_names=False)
+
+
+def _comparer_a_la_reference(resultat, attendu):
+    """Mêmes lignes (index), mêmes colonnes et mêmes valeurs que la référence."""
+    assert set(resultat.columns) == set(attendu.columns) | set(COLONNES_AJOUTEES)
+    resultat = resultat[attendu.columns].assign(Maturity=resultat["Maturity"].dt.date)
+    # Maturity : datetime64 au lieu des objets date de la référence ; colonnes compactées
+    # (category) comparées en object, valeurs manquantes en None des deux côtés
+    categorielles = [col for col in resultat.columns if isinstance(resultat[col].dtype, pd.CategoricalDtype)]
+    resultat = resultat.astype({col: object for col in categorielles})
+    for col in categorielles:
+        resultat[col] = resultat[col].where(resultat[col].notna(), None)
+        attendu = attendu.assign(**{col: attendu[col].where(attendu[col].notna(), None)})
+    pd.testing.assert_frame_equal(resultat, attendu, check_dtype=False)
+
+
+@pytest.fixture(scope="module")
+def runs():
+    runs = generer_runs(60_000, seed=3)
+    # Maturités hors bornes, vides et illisibles en plus de celles du générateur
+    extremes = ["2100-01-01", "2100-01-02", "2350-01-01", None, np.nan, "", "n/a", "2099-12-31"]
+    runs["Maturity"] = runs["Maturity"].astype(object)
+    runs.loc[runs.index[:len(extremes) * 50], "Maturity"] = extremes * 50
+    return runs
+
+
+@pytest.fixture(scope="module")
+def reference_runs(runs):
+    return reference.clean_full_dataframe(runs)
+
+
+@pytest.mark.parametrize("schema", [None, "defaut"])
+def test_clean_full_dataframe_parite(runs, reference_runs, schema):
+    full_attendu, best_attendu, last_import_attendu = reference_runs
+    kwargs = {"schema": None} if schema is None else {}
+    full, best, last_import = clean_full_dataframe(runs, date_reference="2025-06-02", **kwargs)
+    assert last_import == last_import_attendu
+    _comparer_a_la_reference(full, full_attendu)
+    _comparer_a_la_reference(best, best_attendu)
+
+
+def _runs_maturites(maturites):
+    n = len(maturites)
+    return pd.DataFrame({
+        "ImportDateTime": ["2025-06-02 08:00:00"] * n,
+        "Dealer": ["GS"] * n,
+        "Isin": [f"XS{i:010d}" for i in range(n)],
+        "Sector": ["IG - Industrial"] * n,
+        "Maturity": maturites,
+        "Fitch rating": ["A"] * n,
+        "Moody's rating": ["A2"] * n,
+        "IA_Offer_Price": [99.5] * n,
+        "IA_Offer_YLD": ["4,25%"] * n,
+        "IA_Offer_QTY": ["1 000"] * n,
+        "IA_Offer_BMK_SPD": [120] * n,
+        "IA_Offer_I-SPD": [110] * n,
+        "IA_Offer_Z-SPD": [115] * n,
+        "IA_Offer_ASW": [105] * n,
+        "Stream_Offer_Price": [np.nan] * n,
+        "Stream_Offer_YLD": [np.nan] * n,
+    })
+
+
+def test_borne_maturite():
+    # Maturité manquante, illisible ou au-delà du 2100-01-01 -> date fictive 2099-12-31
+    fictive = pd.Timestamp("2099-12-31")
+    cas = [
+        ("2030-05-15", pd.Timestamp("2030-05-15")),
+        (pd.Timestamp("2099-12-31"), fictive),
+        (pd.Timestamp("2100-01-01"), pd.Timestamp("2100-01-01")),
+        (pd.Timestamp("2100-01-01 00:00:01"), fictive),
+        (pd.Timestamp("2150-06-30"), fictive),
+        ("2350-01-01", fictive),
+        (None, fictive),
+        (np.nan, fictive),
+        (pd.NaT, fictive),
+        ("", fictive),
+        ("n/a", fictive),
+    ]
+    runs = _runs_maturites([maturite for maturite, _ in cas])
+    full, _, _ = clean_full_dataframe(runs, schema=None, date_reference="2025-06-02")
+    attendu = pd.Series([date for _, date in cas], name="Maturity", dtype="datetime64[ns]")
+    pd.testing.assert_series_equal(full["Maturity"].reset_index(drop=True), attendu, check_dtype=False)
+    assert (full.loc[full["Maturity"] == fictive, "MaturityBucket"] == "PERP").all()
+
+    full_attendu, _, _ = reference.clean_full_dataframe(runs)
+    _comparer_a_la_reference(full, full_attendu)
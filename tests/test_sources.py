@@ -0,0 +1,139 @@
+"""
+SQLSource contre une base SQLite temporaire : récupération incrémentale du dernier import,
+historique, et pool de connexions (une connexion en erreur n'est pas remise dans le pool).
+"""
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from utils.sources import ConnectionPool, SQLSource, identifiant_sql
+
+IMPORT_1 = "2025-06-02 08:00:00"
+IMPORT_2 = "2025-06-02 14:30:00"
+IMPORT_3 = "2025-06-03 08:00:00"
+
+
+def _inserer(chemin, import_date, isins, dealer="GS"):
+    with sqlite3.connect(chemin) as conn:
+        conn.executemany(
+            'INSERT INTO Runs ("ImportDateTime", "Dealer", "ISIN", "Currency", "IA_Offer_YLD") VALUES (?, ?, ?, ?, ?)',
+            [(import_date, dealer, isin, "EUR", 4.0 + i / 10) for i, isin in enumerate(isins)],
+        )
+    conn.close()
+
+
+@pytest.fixture
+def base(tmp_path):
+    chemin = str(tmp_path / "axes.db")
+    with sqlite3.connect(chemin) as conn:
+        conn.execute('CREATE TABLE Runs ("ImportDateTime" TEXT, "Dealer" TEXT, "ISIN" TEXT, '
+                     '"Currency" TEXT, "IA_Offer_YLD" REAL, "Colonne_Inutile" TEXT)')
+    conn.close()
+    _inserer(chemin, IMPORT_1, ["XS0001", "XS0002", "XS0003"])
+    _inserer(chemin, IMPORT_2, ["XS0001", "XS0004"])
+    return chemin
+
+
+def _source(chemin, **kwargs):
+    return SQLSource(lambda: sqlite3.connect(chemin, check_same_thread=False), **kwargs)
+
+
+def _espionner_lectures(source, monkeypatch):
+    """Lignes renvoyées par chaque requête de la source."""
+    lectures = []
+    lire = source._lire
+
+    def lire_espion(requete, params=()):
+        df = lire(requete, params)
+        lectures.append((params, len(df)))
+        return df
+
+    monkeypatch.setattr(source, "_lire", lire_espion)
+    return lectures
+
+
+def test_premier_fetch_dernier_import_seulement(base):
+    df = _source(base).fetch()
+    assert sorted(df["ISIN"]) == ["XS0001", "XS0004"]
+    assert (df["ImportDateTime"] == pd.Timestamp(IMPORT_2)).all()
+    assert "Colonne_Inutile" not in df.columns
+
+
+def test_nouvel_import_remplace_le_precedent(base):
+    source = _source(base)
+    source.fetch()
+    version = source.version
+    _inserer(base, IMPORT_3, ["XS0005", "XS0006", "XS0007"])
+    df = source.fetch()
+    assert sorted(df["ISIN"]) == ["XS0005", "XS0006", "XS0007"]
+    assert (df["ImportDateTime"] == pd.Timestamp(IMPORT_3)).all()
+    assert source.version != version
+
+
+def test_refetch_sans_nouvelles_lignes_relit_l_import_courant(base, monkeypatch):
+    source = _source(base)
+    premier = source.fetch()
+    lectures = _espionner_lectures(source, monkeypatch)
+    df = source.fetch()
+    # Borne >= dernier import vu, passée en texte ISO : seul l'import courant est relu
+    assert lectures == [((IMPORT_2,), 2)]
+    pd.testing.assert_frame_equal(df, premier)
+
+
+def test_lignes_tardives_de_l_import_courant(base):
+    source = _source(base)
+    source.fetch()
+    _inserer(base, IMPORT_2, ["XS0008"], dealer="JPM")
+    df = source.fetch()
+    assert sorted(df["ISIN"]) == ["XS0001", "XS0004", "XS0008"]
+
+
+def test_garder_historique(base):
+    source = _source(base, garder_historique=True)
+    df = source.fetch()
+    assert sorted(df["ISIN"]) == ["XS0001", "XS0004"]
+    _inserer(base, IMPORT_3, ["XS0005"])
+    df = source.fetch()
+    assert df.groupby("ImportDateTime").size().to_dict() == {pd.Timestamp(IMPORT_2): 2, pd.Timestamp(IMPORT_3): 1}
+    # Relecture sans nouvelles lignes : l'historique n'est ni perdu ni dupliqué
+    assert len(source.fetch()) == 3
+
+
+@pytest.mark.parametrize("table", ["Runs; DROP TABLE Runs", "Runs--", "1Runs", "dbo.Runs.x", ""])
+def test_table_invalide(table):
+    with pytest.raises(ValueError):
+        SQLSource(lambda: None, table=table)
+
+
+def test_identifiant_sql_quote():
+    assert identifiant_sql("dbo.Runs") == '"dbo"."Runs"'
+
+
+class _Connexion:
+    def __init__(self):
+        self.fermee = False
+
+    def close(self):
+        self.fermee = True
+
+
+def test_pool_connexion_en_erreur_fermee_et_non_remise():
+    creees = []
+
+    def connect():
+        creees.append(_Connexion())
+        return creees[-1]
+
+    pool = ConnectionPool(connect, taille=1)
+    with pytest.raises(RuntimeError):
+        with pool.connexion():
+            raise RuntimeError("requête en échec")
+    assert creees[0].fermee
+
+    with pool.connexion() as conn:
+        assert conn is creees[1]
+    # Une connexion saine est remise dans le pool et réutilisée
+    with pool.connexion() as conn:
+        assert conn is creees[1]
+    assert len(creees) == 2 and not creees[1].fermee
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+
+def axes_par_dealer(axes_isin):
+    """
+    Profondeur d'un titre : un axe par dealer (le plus proche du mid), trié par Axe_Mid_Spread.
+    `axes_isin` : lignes de df_full_axes d'un même ISIN.
+    """
+    dealer_col = "Dealer" if "Dealer" in axes_isin.columns else "Best_Dealer"
+    tries = axes_isin.sort_values(by="Axe_Mid_Spread", ascending=True)
+    return tries.drop_duplicates(subset=[dealer_col, "ISIN"], keep="first")
+
+
+class BestAxeEngine:
+    """
+    Meilleur axe par ISIN, construit une fois par snapshot sur df_full_axes.
+    - meilleur axe : plus haut AXE_Offer_YLD parmi les quantités > 0 (1re ligne en cas d'égalité)
+    - Nb_Dealers_AXE : nombre de dealers distincts sur l'ISIN, toutes quantités confondues
+    - exclusion des ISIN à dealer unique et quantité nulle
+    Les requêtes sur un sous-ensemble de lignes ou d'ISIN ne regroupent pas toute la table,
+    et update_quote met à jour un couple (ISIN, Dealer) sans reconstruire l'état.
+    """
+
+    def __init__(self, df_full_axes):
+        self.df = df_full_axes
+        self._isin, self.isins = pd.factorize(df_full_axes["ISIN"], sort=True)
+        dealers, self.dealers = pd.factorize(df_full_axes["Dealer"])
+        self._dealer = dealers
+        self._yld = df_full_axes["AXE_Offer_YLD"].to_numpy(dtype="float64", copy=True)
+        self._qty = df_full_axes["AXE_Offer_QTY"].to_numpy(dtype="float64", copy=True)
+        self._overrides = {}
+
+        # Couples (ISIN, Dealer) distincts, pour compter les dealers d'un sous-ensemble
+        n_isin, n_dealer = len(self.isins), max(len(self.dealers), 1)
+        valide = (self._isin >= 0) & (dealers >= 0)
+        cles = self._isin.astype("int64") * n_dealer + dealers
+        couples, inverse = np.unique(cles[valide], return_inverse=True)
+        self._couple = np.full(len(cles), -1, dtype="int64")
+        self._couple[valide] = inverse
+        self._couple_isin = couples // n_dealer
+
+        # Lignes de chaque ISIN (positions croissantes) pour les mises à jour ciblées
+        self._ordre = np.argsort(self._isin, kind="stable")
+        nb_lignes = np.bincount(self._isin[self._isin >= 0], minlength=n_isin)
+        nb_sans_isin = int((self._isin < 0).sum())
+        self._debuts = nb_sans_isin + np.concatenate([[0], np.cumsum(nb_lignes)])
+
+        self._nb_dealers = self._compter_dealers(np.arange(len(df_full_axes)))
+        self._best = np.full(n_isin, -1, dtype="int64")
+        best = self._meilleures_positions(np.arange(len(df_full_axes)))
+        self._best[self._isin[best]] = best
+
+    # --- calculs vectorisés -------------------------------------------------
+
+    def _positions(self, lignes):
+        if lignes is None:
+            return np.arange(len(self.df))
+        lignes = np.asarray(lignes)
+        if lignes.dtype == bool:
+            return np.flatnonzero(lignes)
+        return np.sort(lignes)
+
+    def _meilleures_positions(self, positions):
+        isin, yld = self._isin[positions], self._yld[positions]
+        eligibles = positions[(self._qty[positions] > 0) & ~np.isnan(yld) & (isin >= 0)]
+        if len(eligibles) == 0:
+            return eligibles
+        ordre = np.lexsort((eligibles, -self._yld[eligibles], self._isin[eligibles]))
+        tries = eligibles[ordre]
+        isin_tries = self._isin[tries]
+        premier = np.concatenate([[True], isin_tries[1:] != isin_tries[:-1]])
+        return tries[premier]
+
+    def _compter_dealers(self, positions):
+        couples = self._couple[positions]
+        presents = np.zeros(len(self._couple_isin), dtype=bool)
+        presents[couples[couples >= 0]] = True
+        return np.bincount(self._couple_isin[presents], minlength=len(self.isins))
+
+    # --- requêtes -----------------------------------------------------------
+
+    def best_positions(self, lignes=None, isins=None):
+        """
+        Positions (dans df_full_axes) du meilleur axe par ISIN, triées par ISIN.
+        `lignes` : masque booléen ou positions restreignant les axes considérés.
+        `isins` : liste d'ISIN ; l'état par ISIN précalculé est alors lu directement.
+        Renvoie (positions, nb_dealers par position).
+        """
+        if lignes is None:
+            if isins is None:
+                codes = np.arange(len(self.isins))
+            else:
+                codes = self.isins.get_indexer(pd.unique(pd.Series(list(isins))))
+                codes = np.sort(codes[codes >= 0])
+            best = self._best[codes]
+            codes = codes[best >= 0]
+            return self._best[codes], self._nb_dealers[codes]
+
+        positions = self._positions(lignes)
+        if isins is not None:
+            codes = self.isins.get_indexer(pd.unique(pd.Series(list(isins))))
+            positions = positions[np.isin(self._isin[positions], codes[codes >= 0])]
+        best = self._meilleures_positions(positions)
+        nb_dealers = self._compter_dealers(positions)
+        return best, nb_dealers[self._isin[best]]
+
+    def best(self, lignes=None, isins=None):
+        """Équivalent de df_best (Best_Dealer, Nb_Dealers_AXE) pour le sous-ensemble demandé."""
+        best, nb_dealers = self.best_positions(lignes, isins)
+        df_best = self.df.take(best).rename(columns={"Dealer": "Best_Dealer"})
+        for label, valeurs in self._overrides.items():
+            if label in df_best.index:
+                for col, valeur in valeurs.items():
+                    df_best.loc[label, col] = valeur
+        if self._overrides and "Zone Composite" in df_best.columns:
+            # les prix mis à jour peuvent changer la zone calculée au nettoyage
+            from utils.data_cleaning import zone_composite
+            df_best["Zone Composite"] = zone_composite(df_best)
+        df_best["Nb_Dealers_AXE"] = nb_dealers
+        return df_best[~((df_best["AXE_Offer_QTY"].fillna(0) == 0) & (df_best["Nb_Dealers_AXE"] == 1))]
+
+    def axes_isin(self, isin):
+        """Lignes de df_full_axes d'un ISIN, lues par position (sans parcourir la table)."""
+        code = self.isins.get_indexer([isin])[0]
+        if code < 0:
+            return self.df.iloc[:0]
+        return self.df.take(np.sort(self._ordre[self._debuts[code]:self._debuts[code + 1]]))
+
+    # --- mise à jour incrémentale -------------------------------------------
+
+    def update_quote(self, isin, dealer, **valeurs):
+        """
+        Met à jour la cotation d'un couple (ISIN, Dealer) existant, par ex.
+        update_quote("XS...", "BNP", AXE_Offer_YLD=4.2, AXE_Offer_QTY=0),
+        puis recalcule le meilleur axe de ce seul ISIN. Le snapshot n'est pas modifié :
+        les nouvelles valeurs sont reportées sur les lignes renvoyées par best().
+        """
+        code_isin = self.isins.get_indexer([isin])[0]
+        code_dealer = self.dealers.get_indexer([dealer])[0]
+        if code_isin < 0 or code_dealer < 0:
+            raise KeyError(f"Couple ({isin}, {dealer}) absent du snapshot")
+
+        lignes_isin = self._ordre[self._debuts[code_isin]:self._debuts[code_isin + 1]]
+        lignes = lignes_isin[self._dealer[lignes_isin] == code_dealer]
+        if len(lignes) == 0:
+            raise KeyError(f"Couple ({isin}, {dealer}) absent du snapshot")
+
+        for pos in lignes:
+            label = self.df.index[pos]
+            self._overrides.setdefault(label, {}).update(valeurs)
+        if "AXE_Offer_YLD" in valeurs:
+            self._yld[lignes] = valeurs["AXE_Offer_YLD"]
+        if "AXE_Offer_QTY" in valeurs:
+            self._qty[lignes] = valeurs["AXE_Offer_QTY"]
+
+        best = self._meilleures_positions(lignes_isin)
+        self._best[code_isin] = best[0] if len(best) else -1
@@ -0,0 +1,76 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Bornes par défaut du cache de résultats de filtres (partagé par le process)
+MAX_ENTREES = 128
+MAX_OCTETS = 64 * 1024 * 1024
+
+
+class CacheLRU:
+    """
+    Cache LRU borné en nombre d'entrées et en mémoire (octets des tableaux stockés).
+    Clé : (version du snapshot, table, prédicats normalisés) ; valeur : positions de lignes.
+    Sert aussi aux exports (valeur : bytes du fichier généré).
+    Les compteurs hits / misses / evictions servent à dimensionner les bornes.
+    """
+
+    def __init__(self, max_entrees=MAX_ENTREES, max_octets=MAX_OCTETS):
+        self.max_entrees = max_entrees
+        self.max_octets = max_octets
+        self._entrees = OrderedDict()
+        self._octets = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, cle):
+        with self._lock:
+            valeur = self._entrees.get(cle)
+            if valeur is None:
+                self.misses += 1
+                return None
+            self._entrees.move_to_end(cle)
+            self.hits += 1
+            return valeur
+
+    @staticmethod
+    def _taille(valeur):
+        return valeur.nbytes if isinstance(valeur, np.ndarray) else len(valeur)
+
+    def put(self, cle, valeur):
+        if not isinstance(valeur, bytes):
+            valeur = np.asarray(valeur)
+            valeur.setflags(write=False)
+        if self._taille(valeur) > self.max_octets:
+            return valeur
+        with self._lock:
+            ancienne = self._entrees.pop(cle, None)
+            if ancienne is not None:
+                self._octets -= self._taille(ancienne)
+            self._entrees[cle] = valeur
+            self._octets += self._taille(valeur)
+            while len(self._entrees) > self.max_entrees or self._octets > self.max_octets:
+                _, evincee = self._entrees.popitem(last=False)
+                self._octets -= self._taille(evincee)
+                self.evictions += 1
+        return valeur
+
+    def vider(self):
+        with self._lock:
+            self._entrees.clear()
+            self._octets = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entrees": len(self._entrees),
+                "octets": self._octets,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "taux_hit": self.hits / total if total else 0.0,
+            }
@@ -13,4 +13,46 @@ colonnes_export = [
     "Bond ID", "Sub_Sector", "ISIN", "Currency", "Maturity", "Composite_Offer_Price",
     "AXE_Offer_Price", "AXE_Offer_YLD", "AXE_Offer_BMK_SPD", "AXE_Offer_I-SPD",
     "FitchRating", "Moody's_rating", "Rating_Category"
-]
\ No newline at end of file
+]
+
+# Types des colonnes exportées (schéma des exports Parquet)
+types_export = {
+    "Bond ID": "string", "Sub_Sector": "string", "ISIN": "string", "Currency": "string",
+    "Maturity": "date", "Composite_Offer_Price": "float64", "AXE_Offer_Price": "float64",
+    "AXE_Offer_YLD": "float64", "AXE_Offer_BMK_SPD": "float64", "AXE_Offer_I-SPD": "float64",
+    "FitchRating": "string", "Moody's_rating": "string", "Rating_Category": "string"
+}
+# Colonnes brutes de la feuille "Runs" utilisées par clean_full_dataframe et les tableaux
+# (noms avant renommage ; les deux orthographes sont acceptées)
+colonnes_runs = [
+    "ImportDateTime", "Dealer", "Isin", "ISIN", "Issuer name", "IssuerName", "Bond ID",
+    "Ticker", "Sector", "Currency", "Coupon", "Coupon type", "CouponType", "Maturity",
+    "Fitch rating", "FitchRating", "Moody's rating", "Moody's_rating",
+    "IA_Offer_Price", "IA_Offer_YLD", "IA_Offer_QTY", "IA_Offer_BMK_SPD",
+    "IA_Offer_I-SPD", "IA_Offer_Z-SPD", "IA_Offer_ASW",
+    "Stream_Offer_Price", "Stream_Offer_YLD", "TW_Offer_Price", "TW_Bid_Price"
+]
+
+# Schéma compact des tables nettoyées (df_full_axes, df_best)
+# - "category" : colonnes à faible cardinalité
+# - "float32" / "unsigned" : réduits seulement si la conversion est sans perte
+# ISIN, Bond ID et IssuerName restent en texte : quasi uniques, et les groupby par ISIN
+# sur une catégorie renverraient aussi les ISIN absents du sous-ensemble
+schema_axes = {
+    "Dealer": "category",
+    "Best_Dealer": "category",
+    "Ticker": "category",
+    "Sector": "category",
+    "Sub_Sector": "category",
+    "Currency": "category",
+    "CouponType": "category",
+    "FitchRating": "category",
+    "Moody's_rating": "category",
+    "Rating_Category": "category",
+    "Maturity": "datetime64[ns]",
+    "AXE_Offer_BMK_SPD": "float32",
+    "AXE_Offer_Z-SPD": "float32",
+    "AXE_Offer_I-SPD": "float32",
+    "AXE_Offer_ASW": "float32",
+    "Nb_Dealers_AXE": "unsigned",
+}
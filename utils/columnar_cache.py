@@ -0,0 +1,137 @@
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+
+# Répertoire des copies colonnaires des feuilles Excel
+CACHE_DIR = ".cache_axes"
+# Incrémenté quand le format de la copie change, pour invalider les anciennes
+FORMAT_SNAPSHOT = 2
+# Taille des row groups : permet de sauter les imports anciens à la lecture filtrée
+TAILLE_ROW_GROUP = 50_000
+
+
+def pyarrow_disponible():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def signature_fichier(path, taille_bloc=1 << 20):
+    """
+    Renvoie (taille, mtime, sha256) du fichier source.
+    Toute modification du fichier change la signature et invalide la copie colonnaire.
+    """
+    stat = os.stat(path)
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloc in iter(lambda: f.read(taille_bloc), b""):
+            sha.update(bloc)
+    return stat.st_size, stat.st_mtime_ns, sha.hexdigest()
+
+
+def chemin_snapshot(path, sheet_name, signature, cache_dir=CACHE_DIR):
+    taille, mtime, sha = signature
+    cle = hashlib.sha1(f"{FORMAT_SNAPSHOT}:{taille}:{mtime}:{sha}".encode()).hexdigest()[:16]
+    base = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{base}_{sheet_name}_{cle}.parquet")
+
+
+def _normaliser_pour_parquet(df):
+    """
+    Les colonnes Excel mêlent souvent nombres et textes ("1 000", "4,5%").
+    Arrow refuse les colonnes objet hétérogènes : on les stocke alors en texte,
+    ce que le nettoyage re-parse de toute façon.
+    """
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        valeurs = df[col].dropna()
+        if valeurs.map(type).nunique() > 1:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def _purger_anciens_snapshots(path, sheet_name, garder, cache_dir=CACHE_DIR):
+    prefixe = f"{os.path.splitext(os.path.basename(path))[0]}_{sheet_name}_"
+    for nom in os.listdir(cache_dir):
+        chemin = os.path.join(cache_dir, nom)
+        if nom.startswith(prefixe) and nom.endswith(".parquet") and chemin != garder:
+            try:
+                os.remove(chemin)
+            except OSError:
+                pass
+
+
+def assurer_snapshot(path, sheet_name, cache_dir=CACHE_DIR):
+    """
+    Renvoie le chemin de la copie Parquet de la feuille, en la (re)générant si la signature
+    du fichier source a changé. La colonne ImportDateTime y est stockée déjà parsée
+    (même règle que clean_full_dataframe) pour permettre le filtrage à la lecture.
+    """
+    signature = signature_fichier(path)
+    snapshot = chemin_snapshot(path, sheet_name, signature, cache_dir)
+    if os.path.exists(snapshot):
+        return snapshot
+
+    df = pd.read_excel(path, sheet_name=sheet_name)
+    df.columns = df.columns.astype(str).str.strip()
+    if "ImportDateTime" in df.columns:
+        df["ImportDateTime"] = pd.to_datetime(df["ImportDateTime"], errors="coerce")
+    df = _normaliser_pour_parquet(df)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{snapshot}.{os.getpid()}.tmp"
+    df.to_parquet(tmp, index=False, row_group_size=TAILLE_ROW_GROUP)
+    os.replace(tmp, snapshot)
+    _purger_anciens_snapshots(path, sheet_name, snapshot, cache_dir)
+    return snapshot
+
+
+def _projeter(snapshot, colonnes):
+    if colonnes is None:
+        return None
+    import pyarrow.parquet as pq
+    disponibles = pq.read_schema(snapshot).names
+    return [col for col in disponibles if col in colonnes]
+
+
+def _restaurer_vides(df):
+    # Arrow restitue les vides en None, pd.read_excel en NaN : on garde la convention Excel
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].notna(), np.nan)
+    return df
+
+
+def lire_feuille_colonnaire(path, sheet_name, colonnes=None, cache_dir=CACHE_DIR):
+    """
+    Lit une feuille Excel via une copie Parquet clé (taille, mtime, hash) du fichier source.
+    Le premier appel convertit la feuille entière ; les suivants ne lisent que `colonnes`.
+    """
+    snapshot = assurer_snapshot(path, sheet_name, cache_dir)
+    df = pd.read_parquet(snapshot, columns=_projeter(snapshot, colonnes))
+    return _restaurer_vides(df)
+
+
+def lire_dernier_import_colonnaire(path, sheet_name, colonnes=None, col_date="ImportDateTime",
+                                   cache_dir=CACHE_DIR):
+    """
+    Ne charge que les lignes du dernier import : lecture de la seule colonne `col_date`
+    pour trouver le max, puis lecture filtrée (les row groups hors plage sont sautés
+    grâce aux statistiques Parquet). L'index reprend les positions d'origine des lignes.
+    """
+    import pyarrow.parquet as pq
+
+    snapshot = assurer_snapshot(path, sheet_name, cache_dir)
+    colonnes = _projeter(snapshot, colonnes)
+
+    dates = pd.read_parquet(snapshot, columns=[col_date])[col_date]
+    last_import = dates.max()
+    if pd.isna(last_import):
+        vide = pq.read_schema(snapshot).empty_table().to_pandas()
+        return vide if colonnes is None else vide[colonnes]
+
+    positions = np.flatnonzero((dates == last_import).to_numpy())
+    df = pd.read_parquet(snapshot, columns=colonnes, filters=[(col_date, "==", last_import)])
+    df.index = positions
+    return _restaurer_vides(df)
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+from utils.instrumentation import instrumente
+
+
+def nelson_siegel(x, beta0, beta1, beta2, tau):
+    term1 = beta0
+    term2 = beta1 * (1 - np.exp(-x / tau)) / (x / tau)
+    term3 = beta2 * ((1 - np.exp(-x / tau)) / (x / tau) - np.exp(-x / tau))
+    return term1 + term2 + term3
+
+
+def est_subordonnee(bond_id):
+    """Titres subordonnés : Bond ID terminé par SUB (ou SUB})."""
+    bond_id = bond_id.astype(str)
+    return bond_id.str.endswith("SUB") | bond_id.str.endswith("SUB}")
+
+
+def annees_avant_maturite(maturity, date_ref=None):
+    date_ref = pd.Timestamp.now() if date_ref is None else pd.Timestamp(date_ref)
+    return (pd.to_datetime(maturity, errors="coerce") - date_ref).dt.days / 365
+
+
+@instrumente("courbes.ajustement")
+def ajuster_courbe(x_vals, y_vals, nb_points=300):
+    """
+    Courbe lissée à travers les points (x croissants, sans doublon) :
+    Nelson-Siegel à partir de 4 points, spline cubique en dessous,
+    interpolation linéaire si l'ajustement échoue.
+    Renvoie (x_lisse, y_lisse, libellé).
+    """
+    # scipy (~0,5 s d'import) n'est chargé qu'au premier ajustement
+    from scipy.optimize import curve_fit
+    from scipy.interpolate import UnivariateSpline
+    x_smooth = np.linspace(x_vals.min(), x_vals.max(), nb_points)
+    try:
+        if len(x_vals) >= 4:
+            popt, _ = curve_fit(nelson_siegel, x_vals, y_vals, maxfev=10000)
+            return x_smooth, nelson_siegel(x_smooth, *popt), "Courbe interpolée (Nelson-Siegel)"
+        spline = UnivariateSpline(x_vals, y_vals, k=3, s=0.5)
+        return x_smooth, spline(x_smooth), "Courbe lissée (Spline cubique)"
+    except Exception:
+        return x_smooth, np.interp(x_smooth, x_vals, y_vals), "Courbe linéaire"
+
+
+def points_courbe(df, y_axis, x="X"):
+    """Points (x, y) utilisables pour l'ajustement : sans NaN, triés, un point par x."""
+    return df[[x, y_axis]].dropna().sort_values(x).drop_duplicates(subset=x)
+
+
+def courbe_emetteur(df_best, ticker, y_axis="AXE_Offer_YLD", emetteurs=None, devises=None,
+                    sous_secteurs=None, type_titres=("Subordonnée", "Senior"), date_ref=None):
+    """
+    Courbe d'un groupe émetteur (Ticker) hors interface, mêmes filtres que chercher_emetteur.
+    Renvoie (points, courbe) : les titres retenus avec leur X (années avant maturité),
+    et (x_lisse, y_lisse, libellé) ou None s'il y a moins de 2 points.
+    """
+    df = df_best[df_best["Ticker"] == ticker]
+    if emetteurs:
+        df = df[df["IssuerName"].isin(emetteurs)]
+    if devises:
+        df = df[df["Currency"].isin(devises)]
+    if sous_secteurs:
+        df = df[df["Sub_Sector"].isin(sous_secteurs)]
+    sub = est_subordonnee(df["Bond ID"])
+    if "Subordonnée" not in type_titres:
+        df, sub = df[~sub], sub[~sub]
+    if "Senior" not in type_titres:
+        df = df[sub]
+
+    colonnes = [col for col in ["ISIN", "Bond ID", "IssuerName", "Currency", "Maturity", y_axis] if col in df.columns]
+    points = df[colonnes].assign(X=annees_avant_maturite(df["Maturity"], date_ref))
+    df_curve = points_courbe(points, y_axis)
+    if len(df_curve) < 2:
+        return points, None
+    return points, ajuster_courbe(df_curve["X"].values, df_curve[y_axis].values)
@@ -0,0 +1,54 @@
+"""
+Cube d'agrégats de la page Flux, calculé une fois par snapshot : quantité, nombre d'axes et
+dealers distincts pour chaque combinaison observée des dimensions DIMENSIONS_FLUX.
+Les vues de la page (heatmap, barres) sont des agrégations de ce cube, bien plus petit
+que df_full_axes, au lieu de groupby sur toutes les lignes à chaque rerun.
+"""
+import pandas as pd
+
+DIMENSIONS_FLUX = ["Rating_Category", "Sector", "Sub_Sector", "Moody's_rating",
+                   "MaturityBucket", "Currency", "Dealer"]
+
+
+class CubeFlux:
+    """
+    Cellules du cube : une ligne par combinaison observée des dimensions (valeurs manquantes
+    comprises, pour que chaque axe compte dans toutes les agrégations), avec AXE_Offer_QTY
+    (somme) et Nb_Axes. Dealer étant une dimension, les dealers distincts de n'importe quelle
+    agrégation se déduisent des cellules.
+    """
+
+    def __init__(self, df):
+        self.types = {col: df[col].dtype for col in DIMENSIONS_FLUX}
+        self.cellules = (
+            df.groupby(DIMENSIONS_FLUX, observed=True, dropna=False)["AXE_Offer_QTY"]
+            .agg(["sum", "size"])
+            .rename(columns={"sum": "AXE_Offer_QTY", "size": "Nb_Axes"})
+            .reset_index()
+        )
+        self.nb_axes = len(df)
+        self._vues = {}
+
+    def agreger(self, dimensions):
+        """
+        AXE_Offer_QTY, Nb_Axes et Nb_Dealers par combinaison de `dimensions` (en index), sans les
+        clés manquantes comme un groupby sur df_full_axes. Résultat mémorisé et partagé entre
+        sessions : ne pas le modifier.
+        """
+        dimensions = list(dimensions)
+        cle = tuple(dimensions)
+        if cle not in self._vues:
+            groupes = self.cellules.groupby(dimensions, observed=True)
+            vue = groupes[["AXE_Offer_QTY", "Nb_Axes"]].sum()
+            vue["Nb_Dealers"] = groupes["Dealer"].nunique()
+            self._vues[cle] = vue
+        return self._vues[cle]
+
+    def categories(self, col):
+        """Modalités de `col` dans l'ordre de df_full_axes (catégories), triées sinon."""
+        if isinstance(self.types[col], pd.CategoricalDtype):
+            return list(self.types[col].categories)
+        return sorted(self.cellules[col].dropna().unique())
+
+    def __repr__(self):
+        return f"CubeFlux(axes={self.nb_axes}, cellules={len(self.cellules)})"
@@ -1,35 +1,153 @@
+import hashlib
 import pandas as pd
 import numpy as np
+from utils.colonnes import schema_axes
+from utils.best_axe import BestAxeEngine
+from utils.courbes import annees_avant_maturite
+from utils.instrumentation import instrumente
+
+def empreinte_donnees(df):
+    """Empreinte du contenu d'un DataFrame (valeurs, index et noms de colonnes)."""
+    h = hashlib.sha1()
+    h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    h.update("|".join(map(str, df.columns)).encode())
+    return h.hexdigest()
+
+RATINGS_INVALIDES = {"", "N/A", "NR", "NOT RATED", "WD", "WR", "NAN"}
+
+# Table de correspondance notation -> catégorie (la première catégorie listée l'emporte)
+CATEGORIES_RATING = {
+    "Investment Grade": {"AAA", "AA+", "AA", "AA-", "A+", "A", "A-", "A1", "A2", "A3",
+                         "AA1", "AA2", "AA3", "Aaa", "Aa1", "Aa2", "Aa3"},
+    "Crossover": {"BBB+", "BBB", "BBB-", "BAA1", "BAA2", "BAA3", "BB+", "BB", "BB-"},
+    "High Yield": {"B+", "B", "B-", "B1", "B2", "B3", "BA1", "BA2", "BA3"},
+    "Junk": {"CCC+", "CCC", "CCC-", "CC", "C", "CA", "CAA1", "CAA2", "CAA3"},
+}
+RATING_VERS_CATEGORIE = {
+    rating: categorie
+    for categorie, ratings in reversed(list(CATEGORIES_RATING.items()))
+    for rating in ratings
+}
+
+# Sous-secteurs IG rattachés aux financières
+MOTIFS_IG_FIN = ["CoCo", "Lower Tier", "Upper T2", "SnBnk"]
+
+# Position de l'axe dans la fourchette composite, de la moins chère à la plus chère
+ZONES_COMPOSITE = ["< Bid", "Bid-Mid", "Mid-Offer", "> Offer"]
+
+# Buckets de maturité : bornes hautes en années (incluses) et libellés de chaque schéma.
+# Au-delà de la dernière borne, ou sans maturité : BUCKET_PERP
+BUCKET_PERP = "PERP"
+SCHEMAS_MATURITE = {
+    "standard": ([1, 2, 3, 4, 5, 7, 8, 10, 15, 20, 25, 30],
+                 ["0-1Y", "1-2Y", "2-3Y", "3-4Y", "4-5Y", "5-7Y", "7-8Y", "8-10Y",
+                  "10-15Y", "15-20Y", "20-25Y", "25-30Y"]),
+    "large": ([3, 7, 10, 30], ["0-3Y", "3-7Y", "7-10Y", "10-30Y"]),
+}
 
 def classify_rating_category(row):
     fitch = str(row.get("FitchRating", "")).strip().upper()
     moodys = str(row.get("Moody's_rating", "")).strip().upper()
-    invalid = {"", "N/A", "NR", "NOT RATED", "WD", "WR", "NAN"}
 
-    if fitch not in invalid:
+    if fitch not in RATINGS_INVALIDES:
         rating = fitch
-    elif moodys not in invalid:
+    elif moodys not in RATINGS_INVALIDES:
         rating = moodys
     else:
         return "Not Rated"
 
-    investment_grade = {"AAA", "AA+", "AA", "AA-", "A+", "A", "A-", "A1", "A2", "A3",
-                        "AA1", "AA2", "AA3", "Aaa", "Aa1", "Aa2", "Aa3"}
-    crossover = {"BBB+", "BBB", "BBB-", "BAA1", "BAA2", "BAA3", "BB+", "BB", "BB-"}
-    high_yield = {"B+", "B", "B-", "B1", "B2", "B3", "BA1", "BA2", "BA3"}
-    junk = {"CCC+", "CCC", "CCC-", "CC", "C", "CA", "CAA1", "CAA2", "CAA3"}
-
-    if rating in investment_grade:
-        return "Investment Grade"
-    elif rating in crossover:
-        return "Crossover"
-    elif rating in high_yield:
-        return "High Yield"
-    elif rating in junk:
-        return "Junk"
-    return "Not Rated"
-
-def clean_full_dataframe(df):
+    return RATING_VERS_CATEGORIE.get(rating, "Not Rated")
+
+def _rating_normalise(df, col):
+    if col not in df.columns:
+        return pd.Series("", index=df.index)
+    return df[col].astype(str).str.strip().str.upper()
+
+def classify_rating_categories(df):
+    """
+    Version vectorisée de classify_rating_category sur tout le DataFrame :
+    Fitch prioritaire, Moody's sinon, puis table de correspondance.
+    """
+    fitch = _rating_normalise(df, "FitchRating")
+    moodys = _rating_normalise(df, "Moody's_rating")
+    rating = fitch.where(~fitch.isin(RATINGS_INVALIDES), moodys.where(~moodys.isin(RATINGS_INVALIDES)))
+    return rating.map(RATING_VERS_CATEGORIE).fillna("Not Rated")
+
+def classify_sectors(sub_sector, sector):
+    """IG FIN / IG CORPO pour les sous-secteurs IG, secteur extrait sinon."""
+    est_ig = sub_sector.str.startswith("IG", na=False)
+    est_fin = sub_sector.str.contains("|".join(MOTIFS_IG_FIN), regex=True, na=False)
+    return pd.Series(
+        np.select([est_ig & est_fin, est_ig], ["IG FIN", "IG CORPO"], default=sector.to_numpy(dtype=object)),
+        index=sector.index, dtype=object
+    )
+
+def zone_composite(df):
+    """
+    Zone Composite de chaque ligne (catégorielle ordonnée, NaN si axe, bid ou offer manque) :
+    "> Offer" si axe > offer, "Mid-Offer" si axe > mid, "Bid-Mid" si axe >= bid, "< Bid" sinon.
+    """
+    bid = pd.to_numeric(df["Composite_Bid_Price"], errors="coerce").to_numpy(dtype="float64")
+    offer = pd.to_numeric(df["Composite_Offer_Price"], errors="coerce").to_numpy(dtype="float64")
+    axe = pd.to_numeric(df["AXE_Offer_Price"], errors="coerce").to_numpy(dtype="float64")
+    with np.errstate(invalid="ignore"):
+        codes = np.select([axe > offer, axe > (bid + offer) / 2, axe >= bid], [3, 2, 1], default=0)
+    codes[np.isnan(axe) | np.isnan(bid) | np.isnan(offer)] = -1
+    return pd.Series(pd.Categorical.from_codes(codes, categories=ZONES_COMPOSITE, ordered=True),
+                     index=df.index, name="Zone Composite")
+
+def buckets_maturite(annees, schema="standard"):
+    """
+    Bucket de chaque durée résiduelle `annees` (catégorielle ordonnée, BUCKET_PERP en dernier).
+    `schema` : nom d'un schéma de SCHEMAS_MATURITE ou couple (bornes croissantes, libellés).
+    """
+    bornes, libelles = SCHEMAS_MATURITE[schema] if isinstance(schema, str) else schema
+    # bornes incluses : delta <= borne ; NaN (sans maturité) après la dernière borne
+    codes = np.searchsorted(np.asarray(bornes, dtype="float64"), np.asarray(annees, dtype="float64"), side="left")
+    return pd.Categorical.from_codes(codes, categories=list(libelles) + [BUCKET_PERP], ordered=True)
+
+def appliquer_schema(df, schema=schema_axes):
+    """Convertit les colonnes présentes selon le schéma compact (voir utils/colonnes.py)."""
+    df = df.copy()
+    for col, dtype in schema.items():
+        if col not in df.columns:
+            continue
+        if dtype == "category":
+            df[col] = df[col].astype("category")
+        elif dtype.startswith("datetime64"):
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+        elif dtype == "float32":
+            valeurs = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="float64")
+            reduites = valeurs.astype("float32")
+            if np.array_equal(reduites.astype("float64"), valeurs, equal_nan=True):
+                df[col] = reduites
+        elif dtype == "unsigned" and df[col].notna().all() and (df[col] >= 0).all():
+            df[col] = pd.to_numeric(df[col], downcast="unsigned")
+    return df
+
+def rapport_memoire(avant, apres):
+    """
+    Octets par colonne avant/après compaction.
+    `avant` et `apres` : dictionnaires {nom de table: DataFrame}.
+    """
+    lignes = []
+    for nom, df_avant in avant.items():
+        mem_avant = df_avant.memory_usage(deep=True, index=False)
+        mem_apres = apres[nom].memory_usage(deep=True, index=False)
+        for col in mem_avant.index:
+            lignes.append({"Table": nom, "Colonne": col, "Avant": int(mem_avant[col]), "Après": int(mem_apres.get(col, 0))})
+    rapport = pd.DataFrame(lignes, columns=["Table", "Colonne", "Avant", "Après"])
+    rapport["Gain"] = rapport["Avant"] - rapport["Après"]
+    return rapport.sort_values("Gain", ascending=False, ignore_index=True)
+
+@instrumente("nettoyage.clean_full_dataframe")
+def clean_full_dataframe(df, schema=schema_axes, date_reference=None):
+    """
+    Nettoie les axes bruts et renvoie (df_full_axes, df_best, last_import) pour le dernier import.
+    Les tables sont compactées selon `schema` (None : types pandas par défaut).
+    "Années avant maturité" et MaturityBucket sont calculés par rapport à `date_reference`
+    (défaut : aujourd'hui, 0 h), la même pour toutes les lignes.
+    """
     df = df.copy()
     df.columns = df.columns.str.strip()
     df.rename(columns={
@@ -104,8 +222,7 @@ def clean_full_dataframe(df):
     df["Maturity"] = pd.to_datetime(df["Maturity"], errors="coerce")
     limite = pd.Timestamp("2100-01-01")
     fictive = pd.Timestamp("2099-12-31")
-    df["Maturity"] = df["Maturity"].apply(lambda d: fictive if pd.isna(d) or (d > limite) else d)
-    df["Maturity"] = df["Maturity"].dt.date
+    df["Maturity"] = df["Maturity"].mask(df["Maturity"].isna() | (df["Maturity"] > limite), fictive)
 
     for col in ["AXE_Offer_Price", "AXE_Offer_YLD", "AXE_Offer_QTY", "Composite_Offer_Price",
                 "Composite_Bid_Price", "Mid_Price", "Axe_Mid_Spread"]:
@@ -118,40 +235,31 @@ def clean_full_dataframe(df):
     # Sector / Sub_Sector et rating category
     df["Sub_Sector"] = df["Sector"]
     df["Sector"] = df["Sub_Sector"].str.extract(r'^([^ -]+)')
-    df["Sector"] = df.apply(
-        lambda row: "IG FIN" if isinstance(row["Sub_Sector"], str) and row["Sub_Sector"].startswith("IG") and any(
-            x in row["Sub_Sector"] for x in ["CoCo", "Lower Tier", "Upper T2", "SnBnk"])
-        else "IG CORPO" if isinstance(row["Sub_Sector"], str) and row["Sub_Sector"].startswith("IG")
-        else row["Sector"], axis=1)
+    df["Sector"] = classify_sectors(df["Sub_Sector"], df["Sector"])
+
+    df["Rating_Category"] = classify_rating_categories(df)
+    df["Zone Composite"] = zone_composite(df)
 
-    df["Rating_Category"] = df.apply(classify_rating_category, axis=1)
+    date_reference = pd.Timestamp.today().normalize() if date_reference is None else pd.Timestamp(date_reference)
+    df["Années avant maturité"] = annees_avant_maturite(df["Maturity"], date_reference)
+    df["MaturityBucket"] = buckets_maturite(df["Années avant maturité"])
 
     df_full_axes = df.copy()
-    nb_dealers = df_full_axes.groupby("ISIN")["Dealer"].nunique()
-    df_valid = df_full_axes[df_full_axes["AXE_Offer_QTY"] > 0].copy()
-    idx = df_valid.groupby("ISIN")["AXE_Offer_YLD"].idxmax()
-    df_best = df.loc[idx].copy()
-    df_best.rename(columns={"Dealer": "Best_Dealer"}, inplace=True)
-    df_best["Nb_Dealers_AXE"] = df_best["ISIN"].map(nb_dealers)
-    df_best = df_best[~((df_best["AXE_Offer_QTY"].fillna(0) == 0) & (df_best["Nb_Dealers_AXE"] == 1))]
+    df_best = BestAxeEngine(df_full_axes).best()
 
-    return df_full_axes, df_best, last_import
+    if schema is not None:
+        df_full_axes = appliquer_schema(df_full_axes, schema)
+        df_best = appliquer_schema(df_best, schema)
 
-def bucketize_maturity(df):
-    df = df.copy()
-    df["Maturity"] = pd.to_datetime(df["Maturity"], errors="coerce")
+    return df_full_axes, df_best, last_import
 
-    def maturity_bucket(maturity_date):
-        if pd.isna(maturity_date): return "PERP"
-        delta = (maturity_date - pd.Timestamp.now()).days / 365
-        buckets = [(1, "0-1Y"), (2, "1-2Y"), (3, "2-3Y"), (4, "3-4Y"), (5, "4-5Y"),
-                   (7, "5-7Y"), (8, "7-8Y"), (10, "8-10Y"), (15, "10-15Y"),
-                   (20, "15-20Y"), (25, "20-25Y"), (30, "25-30Y")]
-        for limit, label in buckets:
-            if delta <= limit: return label
-        return "PERP"
-
-    df["MaturityBucket"] = df["Maturity"].apply(maturity_bucket)
-    return df
+@instrumente("nettoyage.bucketize_maturity")
+def bucketize_maturity(df, date_reference=None, schema="standard"):
+    """
+    Copie de df avec la colonne MaturityBucket (voir buckets_maturite), maturités comparées à
+    `date_reference` (défaut : maintenant, lu une seule fois pour toutes les lignes).
+    Les tables du snapshot ont déjà la colonne (schéma standard, date du nettoyage).
+    """
+    return df.assign(MaturityBucket=buckets_maturite(annees_avant_maturite(df["Maturity"], date_reference), schema))
 
 
@@ -1,22 +1,133 @@
+import os
+
 import pandas as pd
 import streamlit as st
+from utils.sources import FICHIER_AXES, lire_runs, lire_portefeuille
+from utils.data_cleaning import clean_full_dataframe, empreinte_donnees, rapport_memoire
+from utils.snapshot import construire_snapshot, date_du_jour
+from utils.cache_filtres import CacheLRU
+
+# Intervalle entre deux récupérations incrémentales sur la source SQL (secondes)
+TTL_SOURCE_SQL = 60
+
+
+def _avec_empreinte(df):
+    # Calculée une seule fois par chargement, puis réutilisée à chaque rerun par clean_axes
+    df.attrs["empreinte"] = empreinte_donnees(df)
+    return df
+
+
+def _etat_fichier(path):
+    """(mtime_ns, taille) du fichier, None s'il est absent : clé des lectures mises en cache."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@st.cache_resource(max_entries=1)
+def _lire_axes_excel(etat_fichier, mode, dernier_import):
+    # etat_fichier ne sert que de clé : un nouvel import change mtime / taille et évince la lecture
+    return _avec_empreinte(lire_runs(FICHIER_AXES, mode=mode, dernier_import=dernier_import))
+
 
-@st.cache_data
-def load_mock_data():
+def load_mock_data(mode="columnar", dernier_import=True):
+    """
+    Axes du fichier Excel, relus quand le fichier change (mtime, taille).
+    Une lecture en erreur n'est pas mise en cache : le rerun suivant retente.
+    """
     try:
-        df_axes = pd.read_excel("BDD_axes.xlsx", sheet_name="Runs")
-        df_axes.columns = df_axes.columns.str.strip()
-        return df_axes
+        return _lire_axes_excel(_etat_fichier(FICHIER_AXES), mode, dernier_import)
     except Exception as e:
         st.error(f"Erreur lors du chargement des axes : {e}")
         return pd.DataFrame()
 
-@st.cache_data
+
+@st.cache_resource
+def get_source():
+    """Source d'axes partagée par toutes les sessions (pool de connexions + snapshot)."""
+    from utils.sources import source_depuis_env
+    return source_depuis_env()
+
+
+@st.cache_resource(ttl=TTL_SOURCE_SQL, max_entries=1)
+def _fetch_source_sql():
+    # Une exception n'est pas mise en cache : le rerun suivant retente la récupération
+    return _avec_empreinte(get_source().fetch().copy())
+
+
+def load_axes_data():
+    """Axes bruts du dernier import, depuis la source configurée (SQL live ou Excel de démo)."""
+    from utils.sources import ExcelSource
+    if isinstance(get_source(), ExcelSource):
+        return load_mock_data()
+    try:
+        return _fetch_source_sql()
+    except Exception as e:
+        st.error(f"Erreur lors de la récupération SQL des axes : {e}")
+        return pd.DataFrame()
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _snapshot_partage(empreinte, date_reference, _df_raw):
+    return construire_snapshot(_df_raw, empreinte=empreinte, date_reference=date_reference)
+
+
+def get_snapshot(df_raw):
+    """
+    Snapshot nettoyé partagé par toutes les sessions du process, un par version de données
+    et par jour (date de référence des colonnes de maturité, voir utils/snapshot.py).
+    Aucune copie par session : les pages reçoivent les mêmes DataFrames, en lecture seule.
+    """
+    empreinte = df_raw.attrs.get("empreinte") or empreinte_donnees(df_raw)
+    return _snapshot_partage(empreinte, date_du_jour(), df_raw)
+
+
+def clean_axes(df_raw):
+    """
+    clean_full_dataframe mémorisé par empreinte des données brutes :
+    les reruns ne re-nettoient pas, et un nouvel import évince l'ancienne version.
+    """
+    snapshot = get_snapshot(df_raw)
+    return snapshot.df_full_axes, snapshot.df_best, snapshot.last_import
+
+
+@st.cache_resource
+def get_cache_filtres():
+    """Cache LRU des résultats de filtres, partagé par toutes les sessions du process."""
+    return CacheLRU()
+
+
+@st.cache_resource
+def get_cache_exports():
+    """Fichiers d'export déjà générés (bytes), partagés par toutes les sessions du process."""
+    return CacheLRU(max_entrees=16, max_octets=256 * 1024 * 1024)
+
+
+@st.cache_data(max_entries=1, show_spinner=False)
+def _rapport_memoire_cached(empreinte, _df_raw):
+    full, best, _ = clean_full_dataframe(_df_raw, schema=None)
+    snapshot = get_snapshot(_df_raw)
+    return rapport_memoire({"df_full_axes": full, "df_best": best},
+                           {"df_full_axes": snapshot.df_full_axes, "df_best": snapshot.df_best})
+
+
+def rapport_memoire_axes(df_raw):
+    """Octets gagnés par le schéma compact sur la version courante des données."""
+    empreinte = df_raw.attrs.get("empreinte") or empreinte_donnees(df_raw)
+    return _rapport_memoire_cached(empreinte, df_raw)
+
+
+@st.cache_data(max_entries=1)
+def _lire_portefeuille_excel(etat_fichier):
+    return lire_portefeuille(FICHIER_AXES)
+
+
 def load_mock_portfolio():
+    """Feuille Portfolio, relue quand le fichier change (mtime, taille)."""
     try:
-        df_portfolio = pd.read_excel("BDD_axes.xlsx", sheet_name="Portfolio")
-        df_portfolio.columns = df_portfolio.columns.str.strip()
-        return df_portfolio
+        return _lire_portefeuille_excel(_etat_fichier(FICHIER_AXES))
     except Exception as e:
         st.error(f"Erreur lors du chargement du portefeuille : {e}")
-        return pd.DataFrame()
\ No newline at end of file
+        return pd.DataFrame()
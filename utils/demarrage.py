@@ -0,0 +1,93 @@
+"""
+Chargement paresseux des pages et mesure du coût d'import au démarrage.
+
+    python -m utils.demarrage            coût d'import à froid de chaque page (un interpréteur par module)
+    python -m utils.demarrage --detail   + les dépendances lourdes qu'elle entraîne
+"""
+import argparse
+import importlib
+import subprocess
+import sys
+import threading
+import time
+
+# page -> (module, clé de st.session_state passée à show(), None si show() sans argument)
+PAGES = {
+    "accueil": ("modules.accueil", None),
+    "portfolio": ("modules.portfolio", "df"),
+    "filtrer_les_axes": ("modules.filtrer_les_axes", "df"),
+    "chercher_emetteur": ("modules.chercher_emetteur", "df"),
+    "Whichlist": ("modules.Whichlist", "df"),
+    "flux": ("modules.flux", "df_full_axes"),
+}
+
+# Dépendances dont le coût d'import est suivi
+DEPENDANCES_LOURDES = ["streamlit", "pandas", "scipy", "plotly.express", "openpyxl", "pyarrow"]
+
+# Durée du premier import de chaque page dans ce process (secondes)
+_durees_import = {}
+_lock = threading.Lock()
+
+
+def importer_page(page):
+    """Module de la page, importé à la première navigation ; la durée de ce premier import est conservée."""
+    nom_module = PAGES[page][0]
+    deja_importe = nom_module in sys.modules
+    debut = time.perf_counter()
+    # Toujours par import_module : si une autre session est en train d'importer la page,
+    # sys.modules contient déjà un module partiellement initialisé, et import_module attend la fin
+    module = importlib.import_module(nom_module)
+    if not deja_importe:
+        with _lock:
+            _durees_import.setdefault(nom_module, time.perf_counter() - debut)
+    return module
+
+
+def durees_import():
+    with _lock:
+        return dict(_durees_import)
+
+
+def _cumuls_importtime(sortie):
+    """{module: durée cumulée en secondes} à partir de la sortie de `python -X importtime`."""
+    cumuls = {}
+    for ligne in sortie.splitlines():
+        if not ligne.startswith("import time:") or "cumulative" in ligne:
+            continue
+        _, cumul, nom = ligne[len("import time:"):].split("|")
+        cumuls[nom.strip()] = int(cumul) / 1e6
+    return cumuls
+
+
+def mesurer_import_a_froid(nom_module, prealables=("streamlit", "pandas")):
+    """
+    Import de `nom_module` dans un interpréteur neuf, après `prealables` (déjà payés par toute page).
+    Renvoie (durée totale, {dépendance lourde: durée}) en secondes.
+    """
+    code = "".join(f"import {m}; " for m in prealables) + f"import {nom_module}"
+    resultat = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                              capture_output=True, text=True, check=True)
+    cumuls = _cumuls_importtime(resultat.stderr)
+    lourdes = {dep: cumuls[dep] for dep in DEPENDANCES_LOURDES if dep in cumuls and dep not in prealables}
+    return cumuls.get(nom_module, 0.0), lourdes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coût d'import à froid des pages de l'application.")
+    parser.add_argument("--detail", action="store_true", help="afficher les dépendances lourdes chargées par chaque page")
+    args = parser.parse_args(argv)
+
+    for nom_module in ("pandas", "streamlit"):
+        duree, _ = mesurer_import_a_froid(nom_module, prealables=())
+        print(f"{nom_module:<28}{duree * 1000:9.0f} ms")
+    for page, (nom_module, _) in PAGES.items():
+        duree, lourdes = mesurer_import_a_froid(nom_module)
+        print(f"{nom_module:<28}{duree * 1000:9.0f} ms")
+        if args.detail:
+            for dep, duree_dep in lourdes.items():
+                print(f"    {dep:<24}{duree_dep * 1000:9.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
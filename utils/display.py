@@ -1,8 +1,22 @@
 import streamlit as st 
+import numpy as np
 import pandas as pd
-from io import BytesIO
-from openpyxl import load_workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
+from utils.data_loader import get_cache_exports
+from utils.export import excel_bytes, csv_gzip_bytes, parquet_bytes, cle_export
+from utils.columnar_cache import pyarrow_disponible
+from utils.colonnes import colonnes_affichees
+from utils.index_axes import trier_positions
+
+
+# Affichage des colonnes datetime64 sans l'heure
+CONFIG_COLONNES = {
+    "Maturity": st.column_config.DateColumn("Maturity", format="YYYY-MM-DD"),
+}
+
+
+def date_affichee(valeur):
+    """Date AAAA-MM-JJ d'une valeur isolée (fiches titre en st.table), None si manquante."""
+    return None if pd.isna(valeur) else pd.Timestamp(valeur).strftime("%Y-%m-%d")
 
 
 def bouton_retour_accueil():
@@ -10,32 +24,105 @@ def bouton_retour_accueil():
     st.button("⬅️ Retour à l'accueil", on_click=lambda: st.session_state.update(page="accueil"))
 
 
-def bouton_export_excel(df: pd.DataFrame, nom_fichier: str = "export.xlsx", nom_feuille: str = "Axes"):
-    buffer = BytesIO()
-    wb = load_workbook("utils/template.xlsx")
-    ws = wb.active
+TAILLES_PAGE = [50, 100, 500]
+
+
+def afficher_table_paginee(df, positions=None, colonnes=colonnes_affichees, index=None, cle="table"):
+    """
+    Tableau paginé côté serveur : seules les lignes de la page visible, projetées sur
+    `colonnes`, sont envoyées au navigateur.
+    `positions` : lignes de df à afficher (toutes par défaut) ; le total est len(positions).
+    `index` : IndexAxes de df, pour trier les colonnes indexées sans retrier.
+    """
+    if positions is None:
+        positions = np.arange(len(df))
+    colonnes = [col for col in colonnes if col in df.columns]
+    total = len(positions)
+
+    col_tri, col_sens, col_taille, col_page = st.columns([3, 1, 1, 1])
+    with col_tri:
+        tri = st.selectbox("Trier par", [""] + colonnes, key=f"{cle}_tri")
+    with col_sens:
+        croissant = st.radio("Ordre", ["↑", "↓"], horizontal=True, key=f"{cle}_sens") == "↑"
+    with col_taille:
+        taille = st.selectbox("Lignes par page", TAILLES_PAGE, key=f"{cle}_taille")
+    nb_pages = max(1, -(-total // taille))
+    # La page ne vit que dans session_state (pas de value=) : la ramener à 1 quand le
+    # résultat rétrécit ne crée pas de conflit avec une valeur par défaut du widget
+    cle_page = f"{cle}_page"
+    if st.session_state.get(cle_page, 1) > nb_pages or cle_page not in st.session_state:
+        st.session_state[cle_page] = 1
+    with col_page:
+        page = st.number_input("Page", min_value=1, max_value=nb_pages, step=1, key=cle_page)
 
-    start_row = 3 
+    if tri:
+        positions = trier_positions(df, positions, tri, croissant, index)
+    debut = (page - 1) * taille
+    page_df = df.take(positions[debut:debut + taille])[colonnes]
 
-    for i, row in enumerate(dataframe_to_rows(df, index=False, header=False), start=start_row):
-        for j, value in enumerate(row, start=1):
-            ws.cell(row=i, column=j, value=value)
+    st.dataframe(page_df, use_container_width=True, column_config=CONFIG_COLONNES)
+    st.caption(f"Lignes {min(debut + 1, total):,}–{min(debut + taille, total):,} sur {total:,} (page {page}/{nb_pages})")
 
-    wb.save(buffer)
-    buffer.seek(0)
 
+def bouton_export_excel(df: pd.DataFrame, nom_fichier: str = "export.xlsx", nom_feuille: str = "Axes", version=None):
+    """
+    Bouton de téléchargement Excel (mise en forme de utils/template.xlsx).
+    Le classeur n'est construit qu'au clic, puis gardé en cache sous
+    (version des données, colonnes, lignes) : un second téléchargement est immédiat.
+    `version` : version du snapshot dont df est extrait (sinon empreinte du contenu).
+    """
     st.download_button(
         label="📥 Télécharger Excel",
-        data=buffer.getvalue(),
+        data=_generateur_export(df, version, "xlsx", excel_bytes),
         file_name=nom_fichier,
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
 
 
+def _generateur_export(df, version, format_export, construire):
+    """Fonction passée à st.download_button : fichier généré au clic, puis servi depuis le cache."""
+    cache = get_cache_exports()
+
+    def generer():
+        cle = cle_export(df, version, format_export)
+        donnees = cache.get(cle)
+        if donnees is None:
+            donnees = cache.put(cle, construire(df))
+        return donnees
+
+    return generer
+
+
+def boutons_export(df: pd.DataFrame, nom_fichier: str = "export.xlsx", nom_feuille: str = "Axes", version=None):
+    """
+    Exports Excel (template), CSV gzip et Parquet de df, générés par blocs au clic.
+    Le Parquet (schéma de colonnes_export) n'est proposé que si pyarrow est installé.
+    """
+    base = nom_fichier.rsplit(".", 1)[0]
+    col_excel, col_csv, col_parquet = st.columns(3)
+    with col_excel:
+        bouton_export_excel(df, nom_fichier=nom_fichier, nom_feuille=nom_feuille, version=version)
+    with col_csv:
+        st.download_button(
+            label="📥 Télécharger CSV (gzip)",
+            data=_generateur_export(df, version, "csv.gz", csv_gzip_bytes),
+            file_name=f"{base}.csv.gz",
+            mime="application/gzip"
+        )
+    if pyarrow_disponible():
+        with col_parquet:
+            st.download_button(
+                label="📥 Télécharger Parquet",
+                data=_generateur_export(df, version, "parquet", parquet_bytes),
+                file_name=f"{base}.parquet",
+                mime="application/vnd.apache.parquet"
+            )
+
+
 def message_legal_axes():
     """Affiche l’avertissement réglementaire sur les axes"""
     st.markdown("""
     <div style='text-align:center; font-size:0.85em; color:gray;'>
         ⚠️ Les axes affichés sont fournis à titre indicatif uniquement. Ils ne constituent ni une offre ferme, ni une garantie d’exécution.
     </div>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+    """, unsafe_allow_html=True)
@@ -0,0 +1,142 @@
+import datetime
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.filters import normaliser_etat, evaluer_predicat
+from utils.instrumentation import instrumente
+
+# Écrans enregistrés : {nom: état de filtres} (format de utils/filters.py)
+FICHIER_ECRANS = "ecrans_axes.json"
+
+# Dernière lecture de chaque fichier d'écrans : {chemin: ((mtime_ns, taille), écrans)}
+_lectures = {}
+_lock_lectures = threading.Lock()
+# Sérialise les lecture-modification-écriture des sessions du process
+_lock_ecriture = threading.Lock()
+
+
+def _valeur_json(valeur):
+    if isinstance(valeur, (datetime.date, pd.Timestamp)):
+        return pd.Timestamp(valeur).isoformat()
+    if isinstance(valeur, np.generic):
+        return valeur.item()
+    return valeur
+
+
+def etat_vers_json(etat):
+    """État de filtres sérialisable (dates en ISO 8601)."""
+    return {
+        "plages": {col: [_valeur_json(vmin), _valeur_json(vmax)] for col, (vmin, vmax) in (etat.get("plages") or {}).items()},
+        "categories": {col: [_valeur_json(v) for v in valeurs] for col, valeurs in (etat.get("categories") or {}).items() if len(valeurs)},
+        "exclure_144a": bool(etat.get("exclure_144a")),
+        "tolerance_composite": _valeur_json(etat.get("tolerance_composite")),
+    }
+
+
+def etat_depuis_json(donnees):
+    """Inverse de etat_vers_json : les bornes texte redeviennent des Timestamp."""
+    def borne(valeur):
+        return pd.Timestamp(valeur) if isinstance(valeur, str) else valeur
+
+    return {
+        "plages": {col: (borne(vmin), borne(vmax)) for col, (vmin, vmax) in donnees.get("plages", {}).items()},
+        "categories": dict(donnees.get("categories", {})),
+        "exclure_144a": donnees.get("exclure_144a", False),
+        "tolerance_composite": donnees.get("tolerance_composite"),
+    }
+
+
+def mtime_ecrans(path=FICHIER_ECRANS):
+    """(date de modification en ns, taille) du fichier d'écrans, None s'il n'existe pas."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def charger_ecrans(path=FICHIER_ECRANS):
+    """
+    {nom: état} des écrans enregistrés ; dictionnaire vide si le fichier n'existe pas.
+    Le fichier n'est relu que s'il a été modifié depuis la dernière lecture.
+    """
+    mtime = mtime_ecrans(path)
+    if mtime is None:
+        return {}
+    with _lock_lectures:
+        lecture = _lectures.get(path)
+    if lecture is None or lecture[0] != mtime:
+        with open(path, encoding="utf-8") as f:
+            ecrans = {nom: etat_depuis_json(donnees) for nom, donnees in json.load(f).items()}
+        lecture = (mtime, ecrans)
+        with _lock_lectures:
+            _lectures[path] = lecture
+    return dict(lecture[1])
+
+
+def _ecrire_ecrans(ecrans, path):
+    # Fichier temporaire propre à chaque écriture, dans le même dossier pour que os.replace
+    # reste atomique : deux sauvegardes simultanées n'écrivent pas dans le même .tmp
+    dossier = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=dossier, prefix=".ecrans_",
+                                     suffix=".tmp", delete=False) as f:
+        tmp = f.name
+        try:
+            json.dump({nom: etat_vers_json(etat) for nom, etat in ecrans.items()}, f, ensure_ascii=False, indent=2)
+        except BaseException:
+            f.close()
+            os.remove(tmp)
+            raise
+    os.replace(tmp, path)
+
+
+def sauvegarder_ecran(nom, etat, path=FICHIER_ECRANS):
+    """Ajoute ou remplace l'écran `nom`."""
+    with _lock_ecriture:
+        ecrans = charger_ecrans(path)
+        ecrans[nom] = etat
+        _ecrire_ecrans(ecrans, path)
+
+
+def supprimer_ecran(nom, path=FICHIER_ECRANS):
+    with _lock_ecriture:
+        ecrans = charger_ecrans(path)
+        if ecrans.pop(nom, None) is not None:
+            _ecrire_ecrans(ecrans, path)
+
+
+@instrumente("ecrans.evaluation")
+def evaluer_ecrans(df, ecrans, index=None, cache=None, version=None):
+    """
+    Évalue tous les écrans sur df en une passe.
+    Chaque prédicat normalisé distinct n'est évalué qu'une fois, puis partagé par les
+    écrans qui le contiennent (ex. "Currency = EUR" commun à plusieurs écrans).
+    Avec un cache (utils/cache_filtres.py) et une version de table, les positions sont
+    mémorisées sous (version, prédicats normalisés), la clé de positions_filtrees : seuls
+    les écrans nouveaux ou modifiés sont réévalués d'un rerun à l'autre.
+    Renvoie {nom: {"nb": nombre de lignes, "positions": positions des lignes}}.
+    """
+    predicats_par_ecran = {nom: normaliser_etat(etat) for nom, etat in ecrans.items()}
+    masques = {}
+    resultats = {}
+    for nom, predicats in predicats_par_ecran.items():
+        cle = None if cache is None or version is None else (version, predicats)
+        positions = cache.get(cle) if cle is not None else None
+        if positions is None:
+            masque = np.ones(len(df), dtype=bool)
+            for predicat in predicats:
+                if predicat not in masques:
+                    masques[predicat] = evaluer_predicat(df, predicat, index)
+                masque &= masques[predicat]
+            positions = np.flatnonzero(masque)
+            if len(df) < np.iinfo(np.int32).max:
+                positions = positions.astype(np.int32)
+            if cle is not None:
+                positions = cache.put(cle, positions)
+        resultats[nom] = {"nb": len(positions), "positions": positions}
+    return resultats
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+
+def _convertir_cellule(value):
+    # Même conversion que pd.read_excel : les flottants entiers redeviennent des entiers
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def lire_dernier_import_excel(path, sheet_name, colonnes=None, col_date="ImportDateTime"):
+    """
+    Lecture en flux (openpyxl read-only) des seules lignes du dernier import.
+    1er passage : colonne `col_date` uniquement, pour trouver le dernier import.
+    2e passage : seules les lignes de cet import sont matérialisées.
+    L'index reprend les positions d'origine des lignes, comme pd.read_excel.
+    """
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name]
+        header = [str(h).strip() if h is not None else "" for h in next(ws.iter_rows(max_row=1, values_only=True))]
+        if col_date not in header:
+            raise KeyError(f"Colonne '{col_date}' absente de la feuille {sheet_name}")
+        j_date = header.index(col_date) + 1
+
+        dates = [row[0] for row in ws.iter_rows(min_row=2, min_col=j_date, max_col=j_date, values_only=True)]
+        dates = pd.to_datetime(pd.Series(dates, dtype=object), errors="coerce")
+        last_import = dates.max()
+        positions = np.flatnonzero((dates == last_import).to_numpy()) if pd.notna(last_import) else np.array([], dtype=int)
+
+        indices = [j for j, h in enumerate(header) if colonnes is None or h in colonnes]
+        gardees = set(positions.tolist())
+        lignes = [
+            [_convertir_cellule(row[j]) if j < len(row) else None for j in indices]
+            for pos, row in enumerate(ws.iter_rows(min_row=2, values_only=True))
+            if pos in gardees
+        ]
+    finally:
+        wb.close()
+
+    df = pd.DataFrame(lignes, columns=[header[j] for j in indices], index=positions[:len(lignes)])
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].notna(), np.nan)
+    return df
@@ -0,0 +1,199 @@
+import gzip
+import hashlib
+import os
+from copy import copy
+from functools import lru_cache
+from io import BytesIO
+
+import pandas as pd
+
+from utils.colonnes import types_export
+from utils.columnar_cache import pyarrow_disponible
+from utils.data_cleaning import empreinte_donnees
+from utils.instrumentation import instrumente
+
+FICHIER_TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "template.xlsx")
+# Première ligne de données du template (titre en 1, en-têtes en 2)
+LIGNE_DEBUT = 3
+# Lignes converties à la fois : la mémoire ne dépend pas du nombre de lignes exportées
+TAILLE_BLOC = 10_000
+
+_ATTRIBUTS_STYLE = ("font", "fill", "border", "alignment", "number_format", "protection")
+
+
+def _style(cellule):
+    return {attr: copy(getattr(cellule, attr)) for attr in _ATTRIBUTS_STYLE}
+
+
+@lru_cache(maxsize=None)
+def mise_en_forme_template(path=FICHIER_TEMPLATE):
+    """
+    Mise en forme du template Excel, lue une seule fois par process :
+    titre, en-têtes, style des lignes de données, largeurs, volets figés, filtre et logo.
+    """
+    from openpyxl import load_workbook
+    ws = load_workbook(path).active
+    lignes_entete = []
+    for ligne in ws.iter_rows(min_row=1, max_row=LIGNE_DEBUT - 1):
+        lignes_entete.append([(cellule.value, _style(cellule)) for cellule in ligne])
+    images = []
+    for image in ws._images:
+        image.ref.seek(0)
+        images.append((image.ref.read(), image.width, image.height, copy(image.anchor)))
+    return {
+        "titre_feuille": ws.title,
+        "lignes_entete": lignes_entete,
+        "style_donnees": [_style(cellule) for cellule in ws[LIGNE_DEBUT]],
+        "largeurs": {col: dim.width for col, dim in ws.column_dimensions.items() if dim.width},
+        "hauteurs": {ligne: dim.height for ligne, dim in ws.row_dimensions.items() if dim.height},
+        "fusions": [str(plage) for plage in ws.merged_cells.ranges],
+        "volets": ws.freeze_panes,
+        "filtre": ws.auto_filter.ref,
+        "images": images,
+    }
+
+
+def _cellule(ws, valeur, style):
+    from openpyxl.cell import WriteOnlyCell
+    cellule = WriteOnlyCell(ws, value=valeur)
+    for attr, val in style.items():
+        setattr(cellule, attr, val)
+    return cellule
+
+
+def _blocs_lignes(df):
+    """Lignes de df (valeurs Python, NaN -> cellule vide, dates sans heure), bloc par bloc."""
+    for debut in range(0, len(df), TAILLE_BLOC):
+        bloc = df.iloc[debut:debut + TAILLE_BLOC]
+        colonnes = {}
+        for col in bloc.columns:
+            serie = bloc[col]
+            if pd.api.types.is_datetime64_any_dtype(serie):
+                serie = serie.dt.date
+            serie = serie.astype(object)
+            colonnes[col] = serie.where(serie.notna(), None)
+        yield from zip(*colonnes.values()) if colonnes else ()
+
+
+def _octets(ecrire, df, *args):
+    """Fichier produit par `ecrire` en mémoire (données de st.download_button)."""
+    buffer = BytesIO()
+    ecrire(df, buffer, *args)
+    return buffer.getvalue()
+
+
+@instrumente("export.excel")
+def ecrire_excel(df, cible, path_template=FICHIER_TEMPLATE):
+    """
+    Classeur Excel (mise en forme du template) écrit dans `cible` (chemin ou fichier binaire)
+    en flux avec un writer write-only :
+    les lignes sont envoyées au fichier au fur et à mesure, sans grille de cellules en mémoire.
+    Chaque colonne de données a une cellule portant le style de la ligne de données du
+    template (police, bordure, remplissage, alignement, format), créée une fois et réutilisée
+    d'une ligne à l'autre : le writer sérialise la ligne dès append, seule la valeur change.
+    """
+    # openpyxl n'est chargé qu'au premier export, pas au démarrage de l'application
+    from openpyxl import Workbook
+    from openpyxl.drawing.image import Image
+    from openpyxl.utils import get_column_letter
+    template = mise_en_forme_template(path_template)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(template["titre_feuille"])
+
+    for col, largeur in template["largeurs"].items():
+        ws.column_dimensions[col].width = largeur
+    for j, style in enumerate(template["style_donnees"], start=1):
+        dimension = ws.column_dimensions[get_column_letter(j)]
+        for attr, val in style.items():
+            setattr(dimension, attr, val)
+    for ligne, hauteur in template["hauteurs"].items():
+        ws.row_dimensions[ligne].height = hauteur
+    for plage in template["fusions"]:
+        ws.merged_cells.add(plage)
+    ws.freeze_panes = template["volets"]
+    ws.auto_filter.ref = template["filtre"]
+    for contenu, largeur, hauteur, ancre in template["images"]:
+        image = Image(BytesIO(contenu))
+        image.width, image.height, image.anchor = largeur, hauteur, copy(ancre)
+        ws.add_image(image)
+
+    for ligne in template["lignes_entete"]:
+        ws.append([_cellule(ws, valeur, style) for valeur, style in ligne])
+
+    # Colonnes au-delà du template : valeurs simples (style par défaut de la colonne)
+    cellules = [_cellule(ws, None, style) for style in template["style_donnees"]]
+    for valeurs in _blocs_lignes(df):
+        for cellule, valeur in zip(cellules, valeurs):
+            cellule.value = valeur
+        ws.append(cellules[:len(valeurs)] + list(valeurs[len(cellules):]))
+
+    wb.save(cible)
+
+
+def excel_bytes(df, path_template=FICHIER_TEMPLATE):
+    return _octets(ecrire_excel, df, path_template)
+
+
+@instrumente("export.csv_gzip")
+def ecrire_csv_gzip(df, cible):
+    """CSV compressé gzip écrit bloc par bloc dans le fichier binaire `cible` (dates AAAA-MM-JJ)."""
+    with gzip.GzipFile(fileobj=cible, mode="wb") as f:
+        for debut in range(0, max(len(df), 1), TAILLE_BLOC):
+            bloc = df.iloc[debut:debut + TAILLE_BLOC]
+            texte = bloc.to_csv(index=False, header=debut == 0, date_format="%Y-%m-%d")
+            f.write(texte.encode("utf-8"))
+
+
+def csv_gzip_bytes(df):
+    return _octets(ecrire_csv_gzip, df)
+
+
+def schema_parquet(colonnes):
+    """Schéma pyarrow des colonnes exportées (types de utils/colonnes.types_export, texte par défaut)."""
+    import pyarrow as pa
+    types = {"string": pa.string(), "date": pa.date32(), "float64": pa.float64()}
+    return pa.schema([(col, types[types_export.get(col, "string")]) for col in colonnes])
+
+
+def _bloc_parquet(bloc, schema):
+    import pyarrow as pa
+    colonnes = []
+    for champ in schema:
+        serie = bloc[champ.name]
+        if champ.type == pa.date32():
+            valeurs = pd.to_datetime(serie, errors="coerce").dt.date
+        elif champ.type == pa.float64():
+            valeurs = pd.to_numeric(serie, errors="coerce").astype("float64")
+        else:
+            valeurs = serie.astype(object)
+            valeurs = valeurs.where(valeurs.notna(), None).map(lambda v: v if v is None else str(v))
+        colonnes.append(pa.array(valeurs, type=champ.type, from_pandas=True))
+    return pa.Table.from_arrays(colonnes, schema=schema)
+
+
+@instrumente("export.parquet")
+def ecrire_parquet(df, cible):
+    """
+    Parquet au schéma fixe de colonnes_export écrit dans `cible` (chemin ou fichier binaire),
+    un row group par bloc de lignes. Nécessite pyarrow (voir pyarrow_disponible).
+    """
+    import pyarrow.parquet as pq
+    schema = schema_parquet(df.columns)
+    with pq.ParquetWriter(cible, schema, compression="snappy") as writer:
+        for debut in range(0, len(df), TAILLE_BLOC):
+            writer.write_table(_bloc_parquet(df.iloc[debut:debut + TAILLE_BLOC], schema))
+
+
+def parquet_bytes(df):
+    return _octets(ecrire_parquet, df)
+
+
+def cle_export(df, version=None, format_export="xlsx"):
+    """
+    Clé de cache d'un export : (version des données, colonnes, lignes, format).
+    Sans version, l'empreinte du contenu de df est utilisée.
+    """
+    if version is None:
+        return (empreinte_donnees(df), format_export)
+    lignes = hashlib.sha1(pd.util.hash_array(df.index.to_numpy()).tobytes()).hexdigest()
+    return (version, tuple(df.columns), lignes, format_export)
@@ -1,11 +1,150 @@
+import datetime
+import numpy as np
 import pandas as pd
+from utils.instrumentation import instrumente
 
 def get_slider_range(series):
     """
     Renvoie une plage min/max réaliste pour un slider Streamlit,
     en tenant compte des valeurs nulles ou constantes.
+    `series` : Series ou IndexPlage (min/max lus sans parcourir la colonne).
     """
     vmin, vmax = series.min(), series.max()
     if pd.isnull(vmin) or pd.isnull(vmax) or vmin == vmax:
         return (0.0, 1.0)
     return (float(vmin), float(vmax))
+
+
+# === Moteur de filtres ===
+# Un état de filtres est déclaratif :
+#   {"plages": {col: (min, max)}, "categories": {col: [valeurs]},
+#    "exclure_144a": bool, "tolerance_composite": float | None}
+# Seuls les filtres actifs y figurent. Une borne None est ouverte.
+# Il est compilé en une liste de prédicats normalisés (tuples hashables), évalués
+# directement sur les tableaux de colonnes et combinés en un seul masque.
+# Si des index du snapshot sont fournis (utils/index_axes.py), les plages sont
+# résolues par searchsorted puis intersection de positions, et les sélections
+# de catégories par OU/ET de bitmaps.
+
+def _borne(valeur):
+    if valeur is None:
+        return None
+    if isinstance(valeur, (datetime.date, pd.Timestamp)):
+        return pd.Timestamp(valeur)
+    return float(valeur)
+
+
+def normaliser_etat(etat):
+    """Transforme un état de filtres en tuple trié de prédicats hashables."""
+    predicats = []
+    for col, (vmin, vmax) in (etat.get("plages") or {}).items():
+        predicats.append(("plage", col, _borne(vmin), _borne(vmax)))
+    for col, valeurs in (etat.get("categories") or {}).items():
+        if len(valeurs):
+            predicats.append(("categories", col, tuple(sorted(set(valeurs), key=str))))
+    if etat.get("exclure_144a"):
+        predicats.append(("exclure", "Bond ID", "144A"))
+    if etat.get("tolerance_composite") is not None:
+        predicats.append(("composite", float(etat["tolerance_composite"])))
+    return tuple(sorted(predicats, key=repr))
+
+
+def masque_plage(serie, vmin, vmax):
+    valeurs = serie.to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        vmin = None if vmin is None else np.datetime64(vmin)
+        vmax = None if vmax is None else np.datetime64(vmax)
+    elif pd.api.types.is_float_dtype(valeurs):
+        valeurs = valeurs.astype("float64")
+    masque = ~pd.isna(valeurs)
+    if vmin is not None:
+        masque &= valeurs >= vmin
+    if vmax is not None:
+        masque &= valeurs <= vmax
+    return masque
+
+
+def masque_categories(serie, valeurs):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codes = serie.cat.categories.get_indexer(list(valeurs))
+        return np.isin(serie.cat.codes.to_numpy(), codes[codes >= 0])
+    return serie.isin(valeurs).to_numpy()
+
+
+def evaluer_predicat(df, predicat, index=None):
+    """Masque booléen (numpy) d'un prédicat normalisé sur df, via `index` s'il décrit df."""
+    nature = predicat[0]
+    if index is not None and index.indexe(df):
+        if nature == "plage":
+            return index.masque_plages({predicat[1]: (predicat[2], predicat[3])})
+        if nature == "categories":
+            return index.masque_categories({predicat[1]: predicat[2]})
+    if nature == "plage":
+        _, col, vmin, vmax = predicat
+        return masque_plage(df[col], vmin, vmax)
+    if nature == "categories":
+        _, col, valeurs = predicat
+        return masque_categories(df[col], valeurs)
+    if nature == "exclure":
+        _, col, motif = predicat
+        return ~df[col].astype(str).str.contains(motif, regex=False).to_numpy()
+    if nature == "composite":
+        tol = predicat[1]
+        prix = df["AXE_Offer_Price"].to_numpy()
+        return (prix >= df["Composite_Bid_Price"].to_numpy() - tol) & (prix <= df["Composite_Offer_Price"].to_numpy() + tol)
+    raise ValueError(f"Prédicat inconnu : {predicat!r}")
+
+
+def compiler_filtres(etat):
+    """
+    Compile un état de filtres en une fonction (df, base=None, index=None) -> masque booléen numpy.
+    `index` : IndexAxes de df, utilisé pour les plages s'il décrit bien df.
+    """
+    predicats = normaliser_etat(etat)
+
+    def masque(df, base=None, index=None):
+        resultat = np.ones(len(df), dtype=bool) if base is None else np.asarray(base, dtype=bool).copy()
+        restants = predicats
+        if index is not None and index.indexe(df):
+            plages = {p[1]: (p[2], p[3]) for p in predicats if p[0] == "plage"}
+            selections = {p[1]: p[2] for p in predicats if p[0] == "categories"}
+            if selections:
+                resultat &= index.masque_categories(selections)
+            if plages and resultat.any():
+                resultat &= index.masque_plages(plages)
+            restants = [p for p in predicats if p[0] not in ("plage", "categories")]
+        for predicat in restants:
+            if not resultat.any():
+                break
+            resultat &= evaluer_predicat(df, predicat)
+        return resultat
+
+    masque.predicats = predicats
+    return masque
+
+
+@instrumente("filtres.positions")
+def positions_filtrees(df, etat, index=None, cache=None, version=None):
+    """
+    Positions des lignes de df retenues par `etat`.
+    Avec un cache (utils/cache_filtres.py) et une version de table, le résultat est
+    mémorisé sous (version, prédicats normalisés) : revenir sur un écran déjà vu
+    ne refiltre pas.
+    """
+    filtre = compiler_filtres(etat)
+    cle = None if cache is None or version is None else (version, filtre.predicats)
+    if cle is not None:
+        positions = cache.get(cle)
+        if positions is not None:
+            return positions
+    positions = np.flatnonzero(filtre(df, index=index))
+    if len(df) < np.iinfo(np.int32).max:
+        positions = positions.astype(np.int32)
+    if cle is not None:
+        positions = cache.put(cle, positions)
+    return positions
+
+
+def appliquer_filtres(df, etat, base=None, index=None):
+    """Filtre df en une seule matérialisation. `base` : masque préalable optionnel."""
+    return df[compiler_filtres(etat)(df, base, index)]
@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+# Colonnes numériques / dates filtrées par plage dans filtrer_les_axes et portfolio
+COLONNES_PLAGES = ["AXE_Offer_YLD", "AXE_Offer_BMK_SPD", "Nb_Dealers_AXE",
+                   "AXE_Offer_QTY", "Axe_Mid_Spread", "Maturity"]
+
+# Colonnes filtrées par sélection multiple
+COLONNES_CATEGORIES = ["Sector", "Currency", "Rating_Category", "Ticker", "Best_Dealer"]
+
+
+class IndexPlage:
+    """
+    Index trié d'une colonne : positions des valeurs non nulles triées par valeur.
+    Une requête de plage se résout par deux searchsorted et renvoie des positions de lignes.
+    min()/max() sont lus aux extrémités (utilisables directement par get_slider_range).
+    """
+
+    def __init__(self, serie):
+        valeurs = serie.to_numpy()
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            valeurs = valeurs.astype("datetime64[ns]")
+        elif pd.api.types.is_float_dtype(valeurs):
+            valeurs = valeurs.astype("float64")
+        presents = np.flatnonzero(~pd.isna(valeurs))
+        ordre = np.argsort(valeurs[presents], kind="stable")
+        self.ordre = presents[ordre]
+        self.valeurs = valeurs[self.ordre]
+        self._par_ligne = valeurs
+
+    def _borne(self, valeur):
+        if np.issubdtype(self.valeurs.dtype, np.datetime64):
+            return np.datetime64(pd.Timestamp(valeur), "ns")
+        return valeur
+
+    def positions(self, vmin=None, vmax=None):
+        """Positions (non triées) des lignes avec vmin <= valeur <= vmax ; borne None ouverte."""
+        debut = 0 if vmin is None else np.searchsorted(self.valeurs, self._borne(vmin), side="left")
+        fin = len(self.valeurs) if vmax is None else np.searchsorted(self.valeurs, self._borne(vmax), side="right")
+        return self.ordre[debut:max(debut, fin)]
+
+    def filtrer_positions(self, positions, vmin=None, vmax=None):
+        """Sous-ensemble de `positions` dont la valeur est dans la plage (ordre conservé)."""
+        valeurs = self._par_ligne[positions]
+        garde = ~pd.isna(valeurs)
+        if vmin is not None:
+            garde &= valeurs >= self._borne(vmin)
+        if vmax is not None:
+            garde &= valeurs <= self._borne(vmax)
+        return positions[garde]
+
+    def min(self):
+        return self.valeurs[0] if len(self.valeurs) else np.nan
+
+    def max(self):
+        return self.valeurs[-1] if len(self.valeurs) else np.nan
+
+
+class IndexCategories:
+    """
+    Index bitmap d'une colonne catégorielle : un masque compacté (np.packbits) par valeur,
+    construit à la première sélection de la valeur. Une sélection multiple est un OU
+    bit à bit des masques ; plusieurs colonnes se combinent par ET.
+    `options` : valeurs distinctes non nulles triées, pour les multiselects.
+    """
+
+    def __init__(self, serie):
+        codes, valeurs = pd.factorize(serie, sort=False)
+        self.taille = len(codes)
+        self._code = {valeur: code for code, valeur in enumerate(valeurs)}
+        self.options = sorted(valeurs)
+        # Lignes de chaque code, regroupées par code (tri stable)
+        self._ordre = np.argsort(codes, kind="stable")
+        nb = np.bincount(codes[codes >= 0], minlength=len(valeurs))
+        self._debuts = int((codes < 0).sum()) + np.concatenate([[0], np.cumsum(nb)])
+        self._bitmaps = {}
+
+    def bitmap(self, valeur):
+        code = self._code.get(valeur)
+        if code is None:
+            return np.zeros((self.taille + 7) // 8, dtype=np.uint8)
+        if code not in self._bitmaps:
+            masque = np.zeros(self.taille, dtype=bool)
+            masque[self._ordre[self._debuts[code]:self._debuts[code + 1]]] = True
+            self._bitmaps[code] = np.packbits(masque)
+        return self._bitmaps[code]
+
+    def bitmap_selection(self, valeurs):
+        """OU des bitmaps des valeurs sélectionnées (masque compacté)."""
+        resultat = np.zeros((self.taille + 7) // 8, dtype=np.uint8)
+        for valeur in valeurs:
+            resultat |= self.bitmap(valeur)
+        return resultat
+
+
+class IndexAxes:
+    """
+    Index d'une table du snapshot, construits à la demande puis conservés.
+    La table indexée n'est jamais modifiée (snapshot partagé en lecture seule).
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._plages = {}
+        self._categories = {}
+
+    def indexe(self, df):
+        """Vrai si ces index décrivent bien `df` (même objet)."""
+        return df is self.df
+
+    def plage(self, col):
+        if col not in self._plages:
+            self._plages[col] = IndexPlage(self.df[col])
+        return self._plages[col]
+
+    def categories(self, col):
+        if col not in self._categories:
+            self._categories[col] = IndexCategories(self.df[col])
+        return self._categories[col]
+
+    def options(self, col):
+        """Valeurs proposées dans le multiselect de `col` (triées, sans NaN)."""
+        return self.categories(col).options
+
+    def masque_categories(self, selections):
+        """Masque booléen des lignes vérifiant toutes les sélections {col: [valeurs]}."""
+        resultat = None
+        for col, valeurs in selections.items():
+            bitmap = self.categories(col).bitmap_selection(valeurs)
+            resultat = bitmap if resultat is None else resultat & bitmap
+        if resultat is None:
+            return np.ones(len(self.df), dtype=bool)
+        return np.unpackbits(resultat, count=len(self.df)).astype(bool)
+
+    def positions_plages(self, plages):
+        """
+        Intersection des positions de plusieurs plages {col: (min, max)}.
+        Les positions de la plage la plus sélective (searchsorted) sont ensuite
+        restreintes par les autres plages, sans relire les colonnes entières.
+        Renvoie des positions non triées.
+        """
+        if not plages:
+            return np.arange(len(self.df))
+        candidats = {col: self.plage(col).positions(vmin, vmax) for col, (vmin, vmax) in plages.items()}
+        col_min = min(candidats, key=lambda col: len(candidats[col]))
+        resultat = candidats[col_min]
+        for col, (vmin, vmax) in plages.items():
+            if col != col_min and len(resultat):
+                resultat = self.plage(col).filtrer_positions(resultat, vmin, vmax)
+        return resultat
+
+    def masque_plages(self, plages):
+        """Masque booléen des lignes dans toutes les plages."""
+        masque = np.zeros(len(self.df), dtype=bool)
+        masque[self.positions_plages(plages)] = True
+        return masque
+
+
+def trier_positions(df, positions, col, croissant=True, index=None):
+    """
+    Positions triées selon `col` (valeurs nulles en dernier).
+    Colonne indexée : l'ordre précalculé du snapshot est restreint aux positions demandées,
+    sans tri ; sinon tri des seules lignes demandées.
+    """
+    if index is not None and index.indexe(df) and col in COLONNES_PLAGES:
+        index_col = index.plage(col)
+        retenues = np.zeros(len(df), dtype=bool)
+        retenues[positions] = True
+        ordre = index_col.ordre if croissant else index_col.ordre[::-1]
+        triees = ordre[retenues[ordre]]
+        retenues[triees] = False
+        return np.concatenate([triees, np.flatnonzero(retenues)])
+    valeurs = pd.Series(df[col].take(positions).to_numpy(), index=positions)
+    return valeurs.sort_values(ascending=croissant, kind="stable", na_position="last").index.to_numpy()
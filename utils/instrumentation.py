@@ -0,0 +1,195 @@
+"""
+Mesure des étapes de traitement : durée, lignes en entrée / en sortie, pic mémoire.
+
+    with etape("portfolio.reconstitution", df_trades) as mesure:
+        portefeuille = reconstituer_portefeuille(df_trades)
+        mesure.sortie(portefeuille)
+
+    @instrumente("export.excel")
+    def ecrire_excel(df, cible): ...
+
+Chaque mesure est gardée en mémoire (dernières MAX_MESURES, panneau de debug de l'application)
+et ajoutée en une ligne JSON au journal FICHIER_JOURNAL. Les lignes passent par une file
+(logging QueueHandler) et sont écrites par un thread dédié : les étapes n'attendent pas le
+disque. Le journal tourne à TAILLE_MAX_JOURNAL (NB_ARCHIVES_JOURNAL fichiers .1, .2, ... gardés).
+Le pic mémoire n'est mesuré que si
+tracemalloc est actif (AXES_TRACE_MEMOIRE=1 ou activer_trace_memoire()), car le suivi des
+allocations ralentit le process ; il est global au process, donc approximatif quand
+plusieurs sessions calculent en même temps.
+"""
+import atexit
+import functools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+FICHIER_JOURNAL = os.environ.get("AXES_JOURNAL_ETAPES", "journal_etapes.jsonl")
+TAILLE_MAX_JOURNAL = int(os.environ.get("AXES_JOURNAL_TAILLE_MAX", 20 * 1024 * 1024))
+NB_ARCHIVES_JOURNAL = 3
+MAX_MESURES = 500
+
+_mesures = deque(maxlen=MAX_MESURES)
+_lock = threading.Lock()
+_pile = threading.local()
+
+_logger_journal = logging.getLogger("axes.journal_etapes")
+_logger_journal.setLevel(logging.INFO)
+_logger_journal.propagate = False
+_journal = {"chemin": None, "ecrivain": None}
+_lock_journal = threading.Lock()
+
+
+def activer_trace_memoire():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def desactiver_trace_memoire():
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+if os.environ.get("AXES_TRACE_MEMOIRE") == "1":
+    activer_trace_memoire()
+
+
+def _nb_lignes(objet):
+    """Nombre de lignes d'un DataFrame / tableau, du premier élément qui en a un dans un tuple, sinon None."""
+    if isinstance(objet, tuple):
+        return next((n for n in map(_nb_lignes, objet) if n is not None), None)
+    if hasattr(objet, "shape") and getattr(objet, "ndim", 0) >= 1:
+        return int(objet.shape[0])
+    return None
+
+
+class Mesure:
+    def __init__(self, nom, lignes_entree=None):
+        self.nom = nom
+        self.lignes_entree = lignes_entree
+        self.lignes_sortie = None
+        self.duree = None
+        self.pic_memoire = None
+        self._memoire_debut = None
+        self._pic = 0
+
+    def sortie(self, objet):
+        """Enregistre le nombre de lignes produites par l'étape et renvoie `objet`."""
+        self.lignes_sortie = _nb_lignes(objet)
+        return objet
+
+    def en_dict(self):
+        return {
+            "etape": self.nom,
+            "duree_s": round(self.duree, 6),
+            "lignes_entree": self.lignes_entree,
+            "lignes_sortie": self.lignes_sortie,
+            "pic_memoire_octets": self.pic_memoire,
+        }
+
+
+def _releve_memoire():
+    """Reporte le pic tracemalloc depuis le dernier relevé sur toutes les étapes en cours du thread."""
+    courant, pic = tracemalloc.get_traced_memory()
+    for mesure in getattr(_pile, "etapes", []):
+        mesure._pic = max(mesure._pic, pic)
+    tracemalloc.reset_peak()
+    return courant
+
+
+def _arreter_journal():
+    ecrivain = _journal["ecrivain"]
+    if ecrivain is not None:
+        ecrivain.stop()
+        for handler in ecrivain.handlers:
+            handler.close()
+    _logger_journal.handlers.clear()
+    _journal.update(chemin=None, ecrivain=None)
+
+
+def _configurer_journal(chemin):
+    """(Re)branche le logger du journal sur `chemin` (FICHIER_JOURNAL peut changer en cours de route)."""
+    with _lock_journal:
+        if _journal["chemin"] == chemin:
+            return
+        _arreter_journal()
+        fichier = RotatingFileHandler(chemin, maxBytes=TAILLE_MAX_JOURNAL, backupCount=NB_ARCHIVES_JOURNAL,
+                                      encoding="utf-8", delay=True)
+        fichier.setFormatter(logging.Formatter("%(message)s"))
+        file_lignes = queue.SimpleQueue()
+        ecrivain = QueueListener(file_lignes, fichier)
+        ecrivain.start()
+        _logger_journal.addHandler(QueueHandler(file_lignes))
+        _journal.update(chemin=chemin, ecrivain=ecrivain)
+
+
+@atexit.register
+def _fermer_journal():
+    """Vide la file dans le journal à la sortie du process."""
+    with _lock_journal:
+        _arreter_journal()
+
+
+def _enregistrer(ligne):
+    with _lock:
+        _mesures.append(ligne)
+    if FICHIER_JOURNAL:
+        if _journal["chemin"] != FICHIER_JOURNAL:
+            _configurer_journal(FICHIER_JOURNAL)
+        _logger_journal.info(json.dumps(ligne, ensure_ascii=False, default=str))
+
+
+@contextmanager
+def etape(nom, entree=None):
+    """Mesure le bloc ; `entree` (DataFrame, tableau) donne les lignes en entrée."""
+    mesure = Mesure(nom, _nb_lignes(entree))
+    trace = tracemalloc.is_tracing()
+    if trace:
+        courant = _releve_memoire()
+        mesure._memoire_debut = mesure._pic = courant
+    if not hasattr(_pile, "etapes"):
+        _pile.etapes = []
+    _pile.etapes.append(mesure)
+    debut = time.perf_counter()
+    try:
+        yield mesure
+    finally:
+        mesure.duree = time.perf_counter() - debut
+        if trace and tracemalloc.is_tracing():
+            _releve_memoire()
+            mesure.pic_memoire = mesure._pic - mesure._memoire_debut
+        _pile.etapes.pop()
+        _enregistrer({"horodatage": datetime.now().isoformat(timespec="milliseconds"),
+                      "thread": threading.current_thread().name,
+                      "profondeur": len(_pile.etapes), **mesure.en_dict()})
+
+
+def instrumente(nom=None):
+    """Décorateur : mesure chaque appel ; lignes en entrée = premier argument, en sortie = résultat."""
+    def decorateur(fonction):
+        nom_etape = nom or f"{fonction.__module__}.{fonction.__qualname__}"
+
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            with etape(nom_etape, args[0] if args else None) as mesure:
+                return mesure.sortie(fonction(*args, **kwargs))
+        return enveloppe
+    return decorateur
+
+
+def mesures():
+    """Mesures les plus récentes du process (les plus anciennes d'abord)."""
+    with _lock:
+        return list(_mesures)
+
+
+def vider_mesures():
+    with _lock:
+        _mesures.clear()
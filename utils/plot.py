@@ -2,47 +2,74 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
+from utils.courbes import annees_avant_maturite
+from utils.data_cleaning import ZONES_COMPOSITE, buckets_maturite, zone_composite
+from utils.instrumentation import instrumente
+
+# Au-delà de SEUIL_WEBGL points au total (plotly ne bascule que trace par trace), le nuage est
+# dessiné en WebGL (scattergl) ; au-delà de MAX_POINTS_SCATTER, il est échantillonné selon la densité
+SEUIL_WEBGL = 1_000
+MAX_POINTS_SCATTER = 20_000
 
 # === Ajoute une colonne de positionnement par rapport à la fourchette composite ===
+@instrumente("plot.zone_composite")
 def calcul_zone_composite(df):
+    """Zone Composite de df : déjà calculée au nettoyage pour les tables du snapshot, sinon calculée ici."""
     if "Zone Composite" in df.columns:
         return df
+    return df.assign(**{"Zone Composite": zone_composite(df)})
+
+def _cases(valeurs, nb_cases):
+    vmin, vmax = np.nanmin(valeurs), np.nanmax(valeurs)
+    if not vmax > vmin:
+        return np.zeros(len(valeurs), dtype=np.int64)
+    return np.minimum(((valeurs - vmin) / (vmax - vmin) * nb_cases).astype(np.int64), nb_cases - 1)
+
+def echantillon_densite(x, y, max_points=MAX_POINTS_SCATTER, nb_cases=100, seed=0):
+    """
+    Positions (croissantes) d'au plus `max_points` points du nuage (x, y), répartis sur une
+    grille nb_cases x nb_cases : chaque case garde au plus k points, k le plus grand possible.
+    Les zones peu denses et les points isolés sont conservés en entier, seules les zones denses
+    sont éclaircies. Tirage déterministe : le nuage ne change pas d'un rerun à l'autre.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n)
 
-    def zone(row):
-        try:
-            bid = row["Composite_Bid_Price"]
-            offer = row["Composite_Offer_Price"]
-            axe = row["AXE_Offer_Price"]
-            mid = (bid + offer) / 2
-            if pd.isna(axe) or pd.isna(bid) or pd.isna(offer):
-                return None
-            if axe > offer:
-                return "> Offer"
-            elif axe > mid:
-                return "Mid-Offer"
-            elif axe >= bid:
-                return "Bid-Mid"
-            else:
-                return "< Bid"
-        except:
-            return None
-
-    df["Zone Composite"] = df.apply(zone, axis=1)
-    return df
+    nb_cases = max(1, min(nb_cases, int(np.sqrt(max_points))))
+    cases = _cases(x, nb_cases) * nb_cases + _cases(y, nb_cases)
+    ordre = np.random.default_rng(seed).permutation(n)
+    ordre = ordre[np.argsort(cases[ordre], kind="stable")]
+    cases_triees = cases[ordre]
+    debuts = np.flatnonzero(np.r_[True, cases_triees[1:] != cases_triees[:-1]])
+    effectifs = np.diff(np.r_[debuts, n])
+    rang = np.arange(n) - np.repeat(debuts, effectifs)
+
+    # plus grand quota par case tel que le total reste sous max_points
+    bas, haut = 1, int(effectifs.max())
+    while bas < haut:
+        quota = (bas + haut + 1) // 2
+        if np.minimum(effectifs, quota).sum() <= max_points:
+            bas = quota
+        else:
+            haut = quota - 1
+    return np.sort(ordre[rang < bas])
 
 def afficher_scatter_parametrable(df, titre="Graphique AXES (paramétrable)", hauteur=600):
-    df = df.copy()
     df = calcul_zone_composite(df)
 
-    # Forcer conversion propre de Maturity sans écraser les NaT valides
-    if "Maturity" in df.columns:
-        df["Maturity"] = pd.to_datetime(df["Maturity"], errors="coerce")
+    # Durée résiduelle et bucket déjà calculés au nettoyage pour les tables du snapshot
     if "Années avant maturité" not in df.columns:
-        df["Années avant maturité"] = (df["Maturity"] - pd.Timestamp.now()).dt.days / 365
+        df = df.assign(**{"Années avant maturité": annees_avant_maturite(df["Maturity"])})
+    if "MaturityBucket" not in df.columns:
+        df = df.assign(MaturityBucket=buckets_maturite(df["Années avant maturité"]))
 
     options_x = ["Années avant maturité", "AXE_Offer_Price", "AXE_Offer_YLD"]
     options_y = ["AXE_Offer_BMK_SPD", "AXE_Offer_Z-SPD", "AXE_Offer_I-SPD", "AXE_Offer_ASW", "AXE_Offer_YLD", "AXE_Offer_Price"]
-    options_color = ["Zone Composite", "Rating_Category", "Sector", "Sub_Sector", "Currency"]
+    options_color = ["Zone Composite", "Rating_Category", "Sector", "Sub_Sector", "Currency", "MaturityBucket"]
 
     with st.expander("Paramétrage du graphique"):
         x_axis = st.selectbox("Axe X", options_x, index=0)
@@ -58,8 +85,12 @@ def afficher_scatter_parametrable(df, titre="Graphique AXES (paramétrable)", ha
         "< Bid": "#1E90FF"
     } if color == "Zone Composite" else None
 
-    # On ne filtre que les X et Y nécessaires
-    df_plot = df[df[x_axis].notna() & df[y_axis].notna()]
+    # On ne garde que les lignes où X et Y sont renseignés, et les colonnes tracées
+    colonnes = list(dict.fromkeys([x_axis, y_axis, color] + [c for c in hover if c in df.columns]))
+    df_plot = df.loc[df[x_axis].notna() & df[y_axis].notna(), colonnes]
+    nb_points = len(df_plot)
+    if nb_points > MAX_POINTS_SCATTER:
+        df_plot = df_plot.iloc[echantillon_densite(df_plot[x_axis], df_plot[y_axis])]
 
     fig = px.scatter(
         df_plot,
@@ -67,17 +98,25 @@ def afficher_scatter_parametrable(df, titre="Graphique AXES (paramétrable)", ha
         y=y_axis,
         color=color,
         color_discrete_map=color_map,
-        hover_data=hover,
+        category_orders={"Zone Composite": ZONES_COMPOSITE[::-1],
+                         "MaturityBucket": list(df["MaturityBucket"].cat.categories)},
+        hover_data=[c for c in hover if c in df_plot.columns],
         height=hauteur,
-        template="plotly_dark"
+        template="plotly_dark",
+        render_mode="webgl" if nb_points > SEUIL_WEBGL else "svg"
     )
     fig.update_traces(marker=dict(size=9, opacity=0.85, line=dict(width=0.5, color="white")))
     fig.update_layout(title=titre)
 
     st.plotly_chart(fig, use_container_width=True)
 
+    echantillon = ""
+    if len(df_plot) < nb_points:
+        affiches, total = (f"{n:,}".replace(",", " ") for n in (len(df_plot), nb_points))
+        echantillon = f"{affiches} points affichés sur {total} : zones denses éclaircies, points isolés conservés. "
     st.markdown(
        "<p style='color:gray; font-size:0.8em; text-align:center;'>"
+       f"{echantillon}"
        "Vous pouvez zoomer sur le graphique et double-cliquer pour réinitialiser la vue."
        "</p>",
        unsafe_allow_html=True
@@ -106,4 +145,4 @@ def bar_flux(df, x, y, title=""):
         color_discrete_sequence=["#1f77b4"],
         template="plotly_dark"
     )
-    return fig
\ No newline at end of file
+    return fig
\ No newline at end of file
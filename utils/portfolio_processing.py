@@ -1,5 +1,8 @@
 import pandas as pd
+from utils.filters import compiler_filtres
+from utils.instrumentation import instrumente
 
+@instrumente("portefeuille.reconstitution")
 def reconstituer_portefeuille(df_trades: pd.DataFrame) -> pd.DataFrame:
     """
     Calcule les positions nettes (buy = +Qty, sell = -Qty) par ISIN et Fonds,
@@ -34,6 +37,41 @@ def reconstituer_portefeuille(df_trades: pd.DataFrame) -> pd.DataFrame:
     return portefeuille
 
 
+def positions_actives(df_trades: pd.DataFrame, asset_manager=None, fonds=None) -> pd.DataFrame:
+    """Positions nettes longues (Qty_Nette > 0), éventuellement restreintes à un Asset Manager / des fonds."""
+    df = df_trades
+    if asset_manager:
+        df = df[df["Asset Manager"] == asset_manager]
+    if fonds:
+        df = df[df["Fonds"].astype(str).str.strip().isin(fonds)]
+    portefeuille = reconstituer_portefeuille(df)
+    return portefeuille[portefeuille["Qty_Nette"] > 0]
+
+
+def aggreger_portefeuille(portefeuille: pd.DataFrame) -> pd.DataFrame:
+    """Une ligne par ISIN : exposition nette totale, dernier sens, dernière opération, nb d'opérations."""
+    return portefeuille.groupby("ISIN", as_index=False).agg({
+        "Qty_Nette": "sum",
+        "Dernier_Sens": "last",
+        "Date_Derniere_Op": "max",
+        "Nb_Operations": "sum"
+    })
+
+
+@instrumente("portefeuille.croisement_axes")
+def croiser_axes_portefeuille(snapshot, portefeuille: pd.DataFrame, etat_filtres=None) -> pd.DataFrame:
+    """
+    Meilleur axe des ISIN en portefeuille, calculé sur les seuls axes retenus par
+    `etat_filtres` (format de utils/filters.py), puis joint à l'exposition agrégée.
+    """
+    df_full = snapshot.df_full_axes
+    masque_portefeuille = df_full["ISIN"].isin(portefeuille["ISIN"]).to_numpy()
+    masque = compiler_filtres(etat_filtres or {})(df_full, base=masque_portefeuille, index=snapshot.index_full)
+    df_best = snapshot.best_engine.best(masque)
+    return df_best.merge(aggreger_portefeuille(portefeuille), on="ISIN", how="inner")
+
+
+@instrumente("portefeuille.detail_fonds")
 def get_qty_nette_by_fonds(df_trades: pd.DataFrame, isin: str):
     """
     Pour un ISIN donné, retourne :
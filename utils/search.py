@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
+from utils.best_axe import axes_par_dealer
+from utils.display import date_affichee
 
 def search_issuer_or_isin(df_full, isin_filter=None):
     if isin_filter is not None:
@@ -31,18 +33,17 @@ def search_issuer_or_isin(df_full, isin_filter=None):
                 "Bond ID": bond.get("Bond ID"),
                 "Émetteur": bond.get("IssuerName"),
                 "ISIN": bond.get("ISIN"),
-                "Maturité": bond.get("Maturity"),
+                "Maturité": date_affichee(bond.get("Maturity")),
                 "Devise": bond.get("Currency"),
                 "Coupon": bond.get("Coupon"),
                 "CouponType": bond.get("CouponType"),
                 "Secteur": bond.get("Sector"),
                 "Notation Moody's": bond.get("Moody's_rating")
             }
-            st.table(pd.DataFrame.from_dict(infos, orient='index', columns=["Valeur"]))
+            st.table(pd.DataFrame.from_dict(infos, orient='index', columns=["Valeur"]).astype("string"))
 
             dealer_col = "Dealer" if "Dealer" in subset.columns else "Best_Dealer"
-            subset_sorted = subset.sort_values(by="Axe_Mid_Spread", ascending=True)
-            subset_unique = subset_sorted.drop_duplicates(subset=[dealer_col, "ISIN"], keep="first")
+            subset_unique = axes_par_dealer(subset)
 
             colonnes = [
                 dealer_col, "AXE_Offer_Price", "AXE_Offer_YLD","AXE_Offer_BMK_SPD","AXE_Offer_QTY",
@@ -0,0 +1,87 @@
+from functools import cached_property
+
+import pandas as pd
+
+from utils.best_axe import BestAxeEngine
+from utils.cube_flux import CubeFlux
+from utils.index_axes import IndexAxes
+from utils.data_cleaning import clean_full_dataframe, empreinte_donnees
+from utils.instrumentation import etape
+
+
+class AxesSnapshot:
+    """
+    Version figée des axes nettoyés pour un import donné, partagée par toutes les sessions.
+    Les pages ne modifient jamais ces DataFrames : elles travaillent sur des masques ou des
+    vues (Copy-on-Write activé dans app.py), si bien que la mémoire dépend du nombre de
+    versions de données et non du nombre d'utilisateurs.
+    `date_reference` : date des durées résiduelles et buckets de maturité des tables.
+    """
+
+    def __init__(self, version, df_full_axes, df_best, last_import, date_reference=None):
+        self.version = version
+        self.df_full_axes = df_full_axes
+        self.df_best = df_best
+        self.last_import = last_import
+        self.date_reference = date_reference
+
+    @cached_property
+    def best_engine(self):
+        """Meilleur axe par ISIN interrogeable par sous-ensemble (voir utils/best_axe.py)."""
+        with etape("snapshot.best_engine", self.df_full_axes):
+            return BestAxeEngine(self.df_full_axes)
+
+    @cached_property
+    def index_best(self):
+        """Index de filtrage de df_best (voir utils/index_axes.py)."""
+        with etape("snapshot.index_best", self.df_best):
+            return IndexAxes(self.df_best)
+
+    @cached_property
+    def index_full(self):
+        """Index de filtrage de df_full_axes."""
+        with etape("snapshot.index_full", self.df_full_axes):
+            return IndexAxes(self.df_full_axes)
+
+    @cached_property
+    def cube_flux(self):
+        """Agrégats de la page Flux par notation, secteur, maturité, devise et dealer (voir utils/cube_flux.py)."""
+        with etape("snapshot.cube_flux", self.df_full_axes) as mesure:
+            cube = CubeFlux(self.df_full_axes)
+            mesure.sortie(cube.cellules)
+            return cube
+
+    def index_pour(self, df):
+        """Index de la table du snapshot `df`, None si df n'en est pas une (copie, sous-table)."""
+        if df is self.df_best:
+            return self.index_best
+        if df is self.df_full_axes:
+            return self.index_full
+        return None
+
+    def __repr__(self):
+        return f"AxesSnapshot(version={self.version!r}, axes={len(self.df_full_axes)}, best={len(self.df_best)})"
+
+
+def date_du_jour():
+    """Date de référence des snapshots construits aujourd'hui (0 h)."""
+    return pd.Timestamp.today().normalize()
+
+
+def version_snapshot(empreinte, date_reference):
+    """
+    Version d'un snapshot : empreinte des données brutes + date de référence. Le lendemain,
+    les mêmes données donnent une autre version (durées résiduelles et buckets recalculés),
+    et les caches indexés par version (filtres, exports, ETag) ne servent plus la veille.
+    """
+    return f"{empreinte}@{date_reference:%Y-%m-%d}"
+
+
+def construire_snapshot(df_raw, empreinte=None, date_reference=None):
+    if empreinte is None:
+        empreinte = empreinte_donnees(df_raw)
+    # Date figée pour toute la version : les buckets ne bougent pas d'une page à l'autre
+    date_reference = date_du_jour() if date_reference is None else pd.Timestamp(date_reference).normalize()
+    df_full_axes, df_best, last_import = clean_full_dataframe(df_raw, date_reference=date_reference)
+    return AxesSnapshot(version_snapshot(empreinte, date_reference), df_full_axes, df_best, last_import,
+                        date_reference)
@@ -0,0 +1,209 @@
+import os
+import queue
+import re
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from utils.colonnes import colonnes_runs
+from utils.columnar_cache import lire_feuille_colonnaire, lire_dernier_import_colonnaire, pyarrow_disponible
+from utils.excel_reader import lire_dernier_import_excel
+from utils.instrumentation import instrumente
+
+FICHIER_AXES = "BDD_axes.xlsx"
+# Nom de table ou de colonne SQL, éventuellement préfixé d'un schéma (dbo.Runs)
+_IDENTIFIANT_SQL = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?")
+
+
+@instrumente("lecture.runs")
+def lire_runs(path=FICHIER_AXES, mode="columnar", dernier_import=True):
+    """
+    Lit la feuille "Runs".
+    - mode "excel" : lecture openpyxl à chaque appel
+    - mode "columnar" : copie Parquet du fichier, projetée sur les colonnes utiles
+    Le mode colonnaire retombe sur la lecture Excel si pyarrow n'est pas installé.
+    Avec `dernier_import`, seules les lignes du dernier ImportDateTime sont chargées
+    (clean_full_dataframe ne garde de toute façon que celles-ci).
+    """
+    if mode == "columnar" and pyarrow_disponible():
+        if dernier_import:
+            df_axes = lire_dernier_import_colonnaire(path, "Runs", colonnes=colonnes_runs)
+        else:
+            df_axes = lire_feuille_colonnaire(path, "Runs", colonnes=colonnes_runs)
+    elif dernier_import:
+        df_axes = lire_dernier_import_excel(path, "Runs")
+    else:
+        df_axes = pd.read_excel(path, sheet_name="Runs")
+    df_axes.columns = df_axes.columns.str.strip()
+    return df_axes
+
+
+@instrumente("lecture.portefeuille")
+def lire_portefeuille(path=FICHIER_AXES):
+    """Feuille "Portfolio" (opérations des fonds), noms de colonnes nettoyés."""
+    df_portfolio = pd.read_excel(path, sheet_name="Portfolio")
+    df_portfolio.columns = df_portfolio.columns.str.strip()
+    return df_portfolio
+
+
+class AxesSource(ABC):
+    """
+    Interface d'une source d'axes bruts (format de la feuille "Runs").
+    `fetch()` renvoie les lignes du dernier import ; `version` change à chaque nouvelle donnée.
+    """
+    version = None
+
+    @abstractmethod
+    def fetch(self) -> pd.DataFrame:
+        ...
+
+
+class ExcelSource(AxesSource):
+    """Source fichier (démo) : BDD_axes.xlsx via le cache colonnaire."""
+
+    def __init__(self, path, mode="columnar"):
+        self.path = path
+        self.mode = mode
+
+    def fetch(self):
+        df = lire_runs(self.path, mode=self.mode)
+        self.version = (self.path, os.path.getmtime(self.path))
+        return df
+
+
+class ConnectionPool:
+    """
+    Pool minimal de connexions DB-API, créées à la demande jusqu'à `taille`.
+    Une connexion qui lève une exception est fermée au lieu d'être remise dans le pool.
+    """
+
+    def __init__(self, connect, taille=4, timeout=30):
+        self._connect = connect
+        self._libres = queue.LifoQueue()
+        self._semaphore = threading.BoundedSemaphore(taille)
+        self._timeout = timeout
+
+    @contextmanager
+    def connexion(self):
+        if not self._semaphore.acquire(timeout=self._timeout):
+            raise TimeoutError("Aucune connexion SQL disponible dans le pool")
+        try:
+            try:
+                conn = self._libres.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                yield conn
+            except Exception:
+                conn.close()
+                raise
+            else:
+                self._libres.put(conn)
+        finally:
+            self._semaphore.release()
+
+    def fermer(self):
+        while not self._libres.empty():
+            self._libres.get_nowait().close()
+
+
+def identifiant_sql(nom):
+    """Identifiant SQL validé puis quoté ("dbo"."Runs") : jamais de texte libre dans la requête."""
+    if not isinstance(nom, str) or not _IDENTIFIANT_SQL.fullmatch(nom):
+        raise ValueError(f"Identifiant SQL invalide : {nom!r}")
+    return ".".join(f'"{partie}"' for partie in nom.split("."))
+
+
+def date_iso(horodatage):
+    """Borne ImportDateTime en texte ISO 8601 (AAAA-MM-JJ HH:MM:SS[.ffffff])."""
+    return horodatage.isoformat(sep=" ")
+
+
+class SQLSource(AxesSource):
+    """
+    Source SQL live avec récupération incrémentale.
+    - 1er appel : seules les lignes du dernier ImportDateTime sont lues
+    - appels suivants : seules les lignes >= dernier ImportDateTime vu sont relues
+      (l'import courant est relu pour capter les lignes écrites après coup)
+    Les lignes reçues remplacent celles du même import dans le snapshot en mémoire.
+    `paramstyle` : "qmark" (sqlite3, pyodbc) ou "format" (pymssql, psycopg2).
+    `convertir_date` : Timestamp -> paramètre de la borne incrémentale. Par défaut texte ISO
+    (date_iso), qui se compare aux dates stockées en texte (SQLite) sans adaptateur datetime ;
+    pd.Timestamp.to_pydatetime pour un driver qui gère les datetime nativement.
+    """
+
+    def __init__(self, connect, table="Runs", taille_pool=4, paramstyle="qmark",
+                 col_date="ImportDateTime", garder_historique=False, convertir_date=date_iso):
+        self._table_sql = identifiant_sql(table)
+        self._col_date_sql = identifiant_sql(col_date)
+        self.pool = ConnectionPool(connect, taille_pool)
+        self.table = table
+        self.col_date = col_date
+        self.convertir_date = convertir_date
+        self.garder_historique = garder_historique
+        self._param = "?" if paramstyle == "qmark" else "%s"
+        self._lock = threading.Lock()
+        self._snapshot = pd.DataFrame()
+        self._dernier_vu = None
+
+    def _lire(self, requete, params=()):
+        with self.pool.connexion() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(requete, params)
+                colonnes = [c[0].strip() for c in cursor.description]
+                lignes = cursor.fetchall()
+            finally:
+                cursor.close()
+        df = pd.DataFrame.from_records(lignes, columns=colonnes)
+        df = df[[col for col in df.columns if col in colonnes_runs]]
+        # NULL SQL -> NaN, comme les cellules vides de pd.read_excel
+        for col in df.columns[df.dtypes == object]:
+            df[col] = df[col].where(df[col].notna(), np.nan)
+        return df
+
+    def _requete_nouvelles_lignes(self):
+        table, col = self._table_sql, self._col_date_sql
+        if self._dernier_vu is None:
+            return f"SELECT * FROM {table} WHERE {col} = (SELECT MAX({col}) FROM {table})", ()
+        return f"SELECT * FROM {table} WHERE {col} >= {self._param}", (self.convertir_date(self._dernier_vu),)
+
+    def fetch(self):
+        with self._lock:
+            requete, params = self._requete_nouvelles_lignes()
+            nouvelles = self._lire(requete, params)
+            if nouvelles.empty:
+                return self._snapshot
+
+            nouvelles[self.col_date] = pd.to_datetime(nouvelles[self.col_date], errors="coerce")
+            if self._snapshot.empty:
+                snapshot = nouvelles
+            else:
+                anciennes = self._snapshot[self._snapshot[self.col_date] < self._dernier_vu]
+                snapshot = pd.concat([anciennes, nouvelles], ignore_index=True)
+
+            self._dernier_vu = snapshot[self.col_date].max()
+            if not self.garder_historique:
+                snapshot = snapshot[snapshot[self.col_date] == self._dernier_vu].reset_index(drop=True)
+
+            self._snapshot = snapshot
+            self.version = (self._dernier_vu, len(snapshot))
+            return snapshot
+
+
+def source_depuis_env():
+    """
+    AXES_SQLITE=chemin.db : source SQL sur une base SQLite locale (tests, démo)
+    sinon : fichier Excel de démonstration.
+    """
+    chemin_sqlite = os.environ.get("AXES_SQLITE")
+    if chemin_sqlite:
+        import sqlite3
+        return SQLSource(
+            lambda: sqlite3.connect(chemin_sqlite, check_same_thread=False),
+            table=os.environ.get("AXES_SQL_TABLE", "Runs")
+        )
+    return ExcelSource(FICHIER_AXES)